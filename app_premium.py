@@ -1,471 +1,370 @@
+from datetime import date, datetime
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import json
-import re
-from datetime import datetime, date
-import pdfplumber
-import requests
-from io import BytesIO
+from finance_engine.ai_jobs import start_ai_job
+from finance_engine.charts import DEFAULT_THEME as DEFAULT_CHART_THEME, THEMES as CHART_THEMES, get_chart
+from finance_engine.config import EngineConfig
+from finance_engine.insights import stream_ai_insights
+from finance_engine.report import generate_financial_report
+from finance_engine.tracing import TRACE_ENABLED, Trace, stage, traced, traces_to_json, traces_to_log
 
-# Page config
-st.set_page_config(
-    page_title="AI Finance Buddy",
-    page_icon="💰",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Heavy dependencies load on first use rather than at startup: pandas/numpy with
+# the data layer when step 2 is reached, plotly in the chart builders, pdfplumber
+# and openpyxl in the parsers and exports, requests inside the LLM client.
+# Check the cost with `python benchmarks/import_time.py`.
 
-# Modern Dark Theme CSS
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    .main {
-        background: #111827;
-        font-family: 'Inter', sans-serif;
-        color: #F9FAFB;
-    }
-    .stApp {
-        background: #111827;
-    }
-    
-    /* Glassmorphism cards */
-    .glass-card {
-        background: rgba(31, 41, 55, 0.8);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(75, 85, 99, 0.3);
-        border-radius: 16px;
-        padding: 1.5rem;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-    }
-    
-    .main-header {
-        background: linear-gradient(135deg, #4F46E5 0%, #9333EA 100%);
-        padding: 2.5rem;
-        border-radius: 20px;
-        text-align: center;
-        margin: 1rem 0;
-        box-shadow: 0 20px 60px rgba(79, 70, 229, 0.3);
-        color: white;
-        border: 1px solid rgba(147, 51, 234, 0.2);
-    }
-    
-    .metric-card {
-        background: rgba(31, 41, 55, 0.8);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(75, 85, 99, 0.3);
-        padding: 1.5rem;
-        border-radius: 16px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-        margin: 0.5rem 0;
-        border-left: 4px solid #10B981;
-        transition: all 0.3s ease;
-        color: #F9FAFB;
-    }
-    .metric-card:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 12px 40px rgba(16, 185, 129, 0.2);
-        border-left-color: #34D399;
-    }
-    
-    .insight-card {
-        background: rgba(31, 41, 55, 0.9);
-        backdrop-filter: blur(25px);
-        border: 1px solid rgba(79, 70, 229, 0.3);
-        padding: 2rem;
-        border-radius: 20px;
-        box-shadow: 0 20px 50px rgba(79, 70, 229, 0.2);
-        margin: 1.5rem 0;
-        color: #F9FAFB;
-    }
-    
-    .investment-card {
-        background: rgba(16, 185, 129, 0.1);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(16, 185, 129, 0.3);
-        padding: 2rem;
-        border-radius: 20px;
-        box-shadow: 0 20px 50px rgba(16, 185, 129, 0.1);
-        margin: 1.5rem 0;
-        color: #F9FAFB;
-    }
-    
-    .cost-cutting-card {
-        background: rgba(239, 68, 68, 0.1);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(239, 68, 68, 0.3);
-        padding: 2rem;
-        border-radius: 20px;
-        box-shadow: 0 20px 50px rgba(239, 68, 68, 0.1);
-        margin: 1.5rem 0;
-        color: #F9FAFB;
-    }
-    
-    .salary-card {
-        background: rgba(31, 41, 55, 0.9);
-        backdrop-filter: blur(25px);
-        border: 1px solid rgba(79, 70, 229, 0.3);
-        padding: 3rem;
-        border-radius: 25px;
-        text-align: center;
-        margin: 2rem 0;
-        box-shadow: 0 25px 70px rgba(79, 70, 229, 0.2);
-        color: #F9FAFB;
-    }
-    
-    .stButton > button {
-        background: linear-gradient(135deg, #4F46E5 0%, #9333EA 100%);
-        color: white;
-        border: none;
-        border-radius: 12px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        box-shadow: 0 8px 25px rgba(79, 70, 229, 0.3);
-        font-family: 'Inter', sans-serif;
-    }
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 12px 35px rgba(79, 70, 229, 0.4);
-        background: linear-gradient(135deg, #5B21B6 0%, #A855F7 100%);
-    }
-    
-    .sidebar .stSelectbox > div > div {
-        background: rgba(31, 41, 55, 0.8);
-        border: 1px solid rgba(75, 85, 99, 0.3);
-        border-radius: 12px;
-        color: #F9FAFB;
-    }
-    
-    .rupee-symbol {
-        color: #10B981;
-        font-weight: bold;
-    }
-    
-    .indian-flag {
-        background: linear-gradient(to right, #ff9933 33%, #ffffff 33%, #ffffff 66%, #138808 66%);
-        height: 4px;
-        width: 100%;
-        margin: 10px 0;
-        border-radius: 2px;
-    }
-    
-    .report-card {
-        background: rgba(31, 41, 55, 0.95);
-        backdrop-filter: blur(30px);
-        border: 1px solid rgba(79, 70, 229, 0.2);
-        padding: 2rem;
-        border-radius: 16px;
-        margin: 1rem 0;
-        color: #F9FAFB;
-        font-family: 'Inter', monospace;
-        white-space: pre-wrap;
-        max-height: 400px;
-        overflow-y: auto;
-    }
-</style>
-""", unsafe_allow_html=True)
+def _get_api_key():
+    """Groq API key from Streamlit secrets, or None if it is missing or a placeholder"""
+    try:
+        api_key = st.secrets.get("GROQ_API_KEY")
+    except Exception:
+        return None
+    if not api_key or api_key == "your-groq-api-key-here":
+        return None
+    return api_key
 
-def parse_text_input(text):
-    """Parse plain text input into DataFrame"""
-    lines = text.strip().split('\n')
-    data = []
-    for line in lines:
-        match = re.search(r'(.+?)\s+(\d+(?:\.\d+)?)', line.strip())
-        if match:
-            category = match.group(1).strip()
-            amount = float(match.group(2))
-            data.append({
-                'Category': category,
-                'Amount': amount,
-                'Date': date.today().strftime('%Y-%m-%d')
-            })
-    return pd.DataFrame(data)
+def _engine_config():
+    """Engine settings for this run, with the API key taken from Streamlit secrets"""
+    return EngineConfig.from_env(api_key=_get_api_key())
 
-def parse_pdf(pdf_file):
-    """Parse PDF file and extract financial data"""
-    data = []
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                lines = text.split('\n')
-                for line in lines:
-                    match = re.search(r'(.+?)\s+(\d+(?:\.\d+)?)', line.strip())
-                    if match:
-                        category = match.group(1).strip()
-                        amount = float(match.group(2))
-                        data.append({
-                            'Category': category,
-                            'Amount': amount,
-                            'Date': date.today().strftime('%Y-%m-%d')
-                        })
-    return pd.DataFrame(data)
+def _chart_theme():
+    """Theme the browser renders the app in, so cached figures are keyed on it"""
+    try:
+        theme = st.context.theme.type
+    except AttributeError:
+        theme = None
+    return theme if theme in CHART_THEMES else DEFAULT_CHART_THEME
 
-def normalize_data(df):
-    """Convert DataFrame to unified JSON format"""
-    if df.empty:
-        return []
-    
-    normalized = []
-    for _, row in df.iterrows():
-        normalized.append({
-            "category": str(row.get('Category', 'Unknown')),
-            "amount": float(row.get('Amount', 0)),
-            "date": str(row.get('Date', date.today().strftime('%Y-%m-%d')))
-        })
-    return normalized
+# Seconds between polls of a running AI job
+AI_POLL_INTERVAL = 0.5
 
-def generate_financial_report(data, salary):
-    """Generate downloadable financial report"""
-    if not data:
-        return "No data available for analysis."
-    
-    total_spending = sum(item['amount'] for item in data)
-    categories = {}
-    for item in data:
-        categories[item['category']] = categories.get(item['category'], 0) + item['amount']
-    
-    savings = salary - total_spending
-    savings_rate = (savings / salary * 100) if salary > 0 else 0
-    
-    # Generate formatted report
-    report = f"""
-═══════════════════════════════════════════════════════════════
-                    AI FINANCE BUDDY - FINANCIAL REPORT
-═══════════════════════════════════════════════════════════════
+def _insight_card_html(text):
+    return f"""
+    <div class="insight-card">
+        <h3>🤖 AI Analysis</h3>
+        <div style="white-space: pre-wrap;">{text}</div>
+    </div>
+    """
 
-📊 FINANCIAL OVERVIEW
-─────────────────────────────────────────────────────────────
-Monthly Salary:           ₹{salary:,.0f}
-Total Monthly Spending:   ₹{total_spending:,.0f}
-Monthly Savings:          ₹{savings:,.0f}
-Savings Rate:             {savings_rate:.1f}%
+def _analysis_key(summary):
+    """Identifies the data, salary and period an AI job was started for"""
+    return (summary.version, summary.salary, summary.period)
 
-💰 SPENDING BREAKDOWN
-─────────────────────────────────────────────────────────────
-"""
-    
-    for category, amount in sorted(categories.items(), key=lambda x: x[1], reverse=True):
-        percentage = (amount / total_spending * 100) if total_spending > 0 else 0
-        report += f"{category:<20} ₹{amount:>8,.0f} ({percentage:>5.1f}%)\n"
-    
-    report += f"""
+@traced("start_ai_analysis")
+def _start_ai_analysis(summary):
+    """Start the AI analysis in the background and return its job"""
+    # Without an API key the engine's stream yields its missing-key message
+    config = _engine_config()
+    return start_ai_job(
+        _analysis_key(summary),
+        lambda report_error: stream_ai_insights(summary, config, report_error)
+    )
 
-🎯 FINANCIAL HEALTH ASSESSMENT
-─────────────────────────────────────────────────────────────
-"""
-    
-    if savings_rate >= 20:
-        report += "✅ EXCELLENT: Your savings rate is outstanding!\n"
-    elif savings_rate >= 10:
-        report += "⚠️  GOOD: Your savings rate is decent but can be improved.\n"
-    else:
-        report += "❌ NEEDS IMPROVEMENT: Your savings rate is below recommended levels.\n"
-    
-    report += f"""
+def _render_ai_job(job):
+    for error in job.errors:
+        st.error(error)
+    st.markdown(_insight_card_html(job.text), unsafe_allow_html=True)
 
-📈 INVESTMENT RECOMMENDATIONS
-─────────────────────────────────────────────────────────────
-Recommended Monthly SIP:  ₹{max(1000, savings * 0.6):,.0f}
-Emergency Fund Target:    ₹{total_spending * 6:,.0f}
+@st.fragment(run_every=AI_POLL_INTERVAL)
+def _live_ai_card(job):
+    """Poll a running AI job and show its partial text until it finishes"""
+    if job.done:
+        # Hand over to a full rerun so the finished card stops polling
+        st.rerun()
+    st.markdown(_insight_card_html(job.text or "🔍 Analyzing your finances..."), unsafe_allow_html=True)
 
-Suggested Indian Stocks:
-• Reliance Industries (RELIANCE)
-• Tata Consultancy Services (TCS)
-• HDFC Bank (HDFCBANK)
-• Infosys (INFY)
-• ICICI Bank (ICICIBANK)
+def _month_name(month):
+    return datetime.strptime(month, '%Y-%m').strftime('%b %Y')
 
-Mutual Fund Categories:
-• Large Cap Funds: 40% allocation
-• Mid Cap Funds: 30% allocation
-• Small Cap Funds: 20% allocation
-• Debt Funds: 10% allocation
+def _select_period(store):
+    """Month range picker for multi-month data; (None, None) means all of it"""
+    months = store.months()
+    if len(months) < 2:
+        return None, None
+    start, end = st.select_slider(
+        "📅 Period",
+        options=months,
+        value=(months[0], months[-1]),
+        format_func=_month_name
+    )
+    if (start, end) == (months[0], months[-1]):
+        return None, None
+    return start, end
 
-✂️ COST CUTTING OPPORTUNITIES
-─────────────────────────────────────────────────────────────
-"""
-    
-    # Find top 3 spending categories
-    top_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)[:3]
-    for i, (category, amount) in enumerate(top_categories, 1):
-        potential_saving = amount * 0.15  # 15% reduction
-        report += f"{i}. {category}: Reduce by ₹{potential_saving:,.0f} (15% cut)\n"
-    
-    report += f"""
+def _quick_add_form():
+    """Sidebar form appending one expense to the current data"""
+    with st.form("quick_add", clear_on_submit=True):
+        st.markdown("**➕ Quick Add Expense**")
+        category = st.text_input("Category", placeholder="Groceries")
+        amount = st.number_input("Amount (₹)", min_value=0.0, step=100.0, format="%.0f")
+        spent_on = st.date_input("Date")
+        if st.form_submit_button("Add Expense", use_container_width=True):
+            if not category.strip() or amount <= 0:
+                st.error("Please enter a category and an amount")
+            else:
+                st.session_state.financial_data = st.session_state.financial_data.append_records([
+                    {"category": category.strip(), "amount": amount, "date": spent_on.isoformat()}
+                ])
+                st.rerun()
 
-💡 ACTIONABLE STEPS
-─────────────────────────────────────────────────────────────
-1. Set up automatic SIP of ₹{max(1000, savings * 0.6):,.0f}/month
-2. Build emergency fund of ₹{total_spending * 6:,.0f}
-3. Track expenses weekly using this app
-4. Review and optimize spending monthly
-5. Consider tax-saving investments (ELSS, PPF)
+def _signed_in_account():
+    """Stable id of the user signed in through Streamlit authentication, or None"""
+    try:
+        if st.user.get("is_logged_in"):
+            return st.user.get("sub") or st.user.get("email")
+    except Exception:
+        pass
+    return None
 
-📅 Generated on: {datetime.now().strftime('%d %B %Y at %I:%M %p')}
-═══════════════════════════════════════════════════════════════
-"""
-    
-    return report
+def _history_panel(parse_cache):
+    """Save the current expenses, or load a saved history, for the signed-in user or a secret history key"""
+    from finance_engine.storage import HISTORY_KEY_MIN_LENGTH, get_storage, history_owner, new_history_key
+    
+    with st.expander("💾 Saved History"):
+        account = _signed_in_account()
+        if account:
+            owner = history_owner(account=account)
+        else:
+            # Set before the key input is drawn, so the new key can fill it
+            if st.button("🔑 New History Key", use_container_width=True):
+                st.session_state.history_key = new_history_key()
+                st.session_state.history_key_new = True
+            key = st.text_input(
+                "History key", key='history_key', type="password",
+                help="Your history is saved under this secret key. Anyone holding it can load your expenses."
+            ).strip()
+            if st.session_state.pop('history_key_new', False):
+                st.caption("Copy this key and keep it private; you need it to load your history on a later visit")
+                st.code(key, language=None)
+            if not key:
+                st.caption("Create a history key, or enter yours, to keep your expenses for your next visit")
+                return
+            if len(key) < HISTORY_KEY_MIN_LENGTH:
+                st.error(f"History keys are at least {HISTORY_KEY_MIN_LENGTH} characters; create a new one")
+                return
+            owner = history_owner(key)
+        try:
+            storage = get_storage()
+        except Exception as e:
+            st.error(f"Storage unavailable: {e}")
+            return
+        
+        status = st.empty()
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Save", use_container_width=True, disabled=not len(st.session_state.financial_data)):
+                storage.save(owner, st.session_state.financial_data)
+        info = storage.info(owner)
+        with col2:
+            if st.button("📂 Load", use_container_width=True, disabled=info is None):
+                # Sessions loading the same saved revision share one read-only store
+                st.session_state.financial_data, _ = parse_cache.get_or_parse(
+                    f"{owner}\x1f{info['revision']}".encode('utf-8'), 'profile', lambda: (storage.load(owner), None)
+                )
+                st.rerun()
+        if info:
+            status.caption(f"Saved: {info['rows']:,} transactions, {datetime.fromtimestamp(info['updated_at']):%d %b %Y %H:%M}")
+        else:
+            status.caption("Nothing saved yet")
 
-def get_ai_insights(data, salary):
-    """Get AI insights with Indian investment suggestions"""
-    if not data:
-        return "No data available for analysis."
-    
-    total_spending = sum(item['amount'] for item in data)
-    categories = {}
-    for item in data:
-        categories[item['category']] = categories.get(item['category'], 0) + item['amount']
-    
-    savings = salary - total_spending
-    savings_rate = (savings / salary * 100) if salary > 0 else 0
+def _edit_selected_rows(store, rows):
+    """Edit the selected transaction or remove every selected one"""
+    st.markdown(f"**✏️ {len(rows)} selected transaction{'s' if len(rows) > 1 else ''}**")
+    if len(rows) == 1:
+        current = store.to_frame(rows[0], rows[0] + 1).iloc[0]
+        with st.form(f"edit_row_{store.version}"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                category = st.text_input("Category", value=current['category'])
+            with col2:
+                amount = st.number_input("Amount (₹)", min_value=0.0, value=float(current['amount']), step=100.0, format="%.0f")
+            with col3:
+                spent_on = st.date_input("Date", value=date.fromisoformat(current['date']) if current['date'] != 'NaT' else None)
+            if st.form_submit_button("💾 Save Changes"):
+                st.session_state.financial_data = store.update(
+                    rows,
+                    category=category.strip() or current['category'],
+                    amount=amount,
+                    date=spent_on.isoformat() if spent_on else None
+                )
+                st.rerun()
+    if st.button(f"🗑️ Remove Selected ({len(rows)})"):
+        st.session_state.financial_data = store.delete(rows)
+        st.rerun()
+
+def _load_cached_upload(parse_cache, uploaded_file):
+    """Parse an uploaded file, reusing earlier results for identical bytes"""
+    from finance_engine.ingest import load_upload
     
-    prompt = f"""
-    You are an expert Indian financial advisor. Analyze this personal financial data:
+    content = uploaded_file.getvalue()
+    kind = uploaded_file.name.rsplit('.', 1)[-1].lower()
+    return parse_cache.get_or_parse(content, kind, lambda: load_upload(content, uploaded_file.name))
+
+@traced("setup_page")
+def _setup_page():
+    """Page config and theme CSS; must run before any other Streamlit call"""
+    # Page config
+    st.set_page_config(
+        page_title="AI Finance Buddy",
+        page_icon="💰",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # Modern Dark Theme CSS
+    st.markdown("""
+    <style>
+        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
-    Monthly Salary: ₹{salary:,.0f}
-    Total Monthly Spending: ₹{total_spending:,.0f}
-    Monthly Savings: ₹{savings:,.0f}
-    Savings Rate: {savings_rate:.1f}%
+        .main {
+            background: #111827;
+            font-family: 'Inter', sans-serif;
+            color: #F9FAFB;
+        }
+        .stApp {
+            background: #111827;
+        }
     
-    Spending Breakdown:
-    {json.dumps(categories, indent=2)}
+        /* Glassmorphism cards */
+        .glass-card {
+            background: rgba(31, 41, 55, 0.8);
+            backdrop-filter: blur(20px);
+            border: 1px solid rgba(75, 85, 99, 0.3);
+            border-radius: 16px;
+            padding: 1.5rem;
+            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
+        }
     
-    Provide detailed analysis with:
+        .main-header {
+            background: linear-gradient(135deg, #4F46E5 0%, #9333EA 100%);
+            padding: 2.5rem;
+            border-radius: 20px;
+            text-align: center;
+            margin: 1rem 0;
+            box-shadow: 0 20px 60px rgba(79, 70, 229, 0.3);
+            color: white;
+            border: 1px solid rgba(147, 51, 234, 0.2);
+        }
     
-    1. **FINANCIAL HEALTH ASSESSMENT**
-    - Budget analysis and spending patterns
-    - Savings rate evaluation (ideal is 20-30%)
+        .metric-card {
+            background: rgba(31, 41, 55, 0.8);
+            backdrop-filter: blur(20px);
+            border: 1px solid rgba(75, 85, 99, 0.3);
+            padding: 1.5rem;
+            border-radius: 16px;
+            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
+            margin: 0.5rem 0;
+            border-left: 4px solid #10B981;
+            transition: all 0.3s ease;
+            color: #F9FAFB;
+        }
+        .metric-card:hover {
+            transform: translateY(-3px);
+            box-shadow: 0 12px 40px rgba(16, 185, 129, 0.2);
+            border-left-color: #34D399;
+        }
     
-    2. **INDIAN INVESTMENT RECOMMENDATIONS**
-    - Suggest specific Indian stocks (Reliance, TCS, HDFC Bank, etc.)
-    - SIP recommendations for mutual funds (amount based on income)
-    - PPF, ELSS, and tax-saving options
-    - Emergency fund suggestions (6 months expenses)
+        .insight-card {
+            background: rgba(31, 41, 55, 0.9);
+            backdrop-filter: blur(25px);
+            border: 1px solid rgba(79, 70, 229, 0.3);
+            padding: 2rem;
+            border-radius: 20px;
+            box-shadow: 0 20px 50px rgba(79, 70, 229, 0.2);
+            margin: 1.5rem 0;
+            color: #F9FAFB;
+        }
     
-    3. **COST-CUTTING STRATEGIES**
-    - Identify top 3 categories to reduce spending
-    - Specific actionable steps to cut costs
-    - Alternative cheaper options for expenses
+        .investment-card {
+            background: rgba(16, 185, 129, 0.1);
+            backdrop-filter: blur(20px);
+            border: 1px solid rgba(16, 185, 129, 0.3);
+            padding: 2rem;
+            border-radius: 20px;
+            box-shadow: 0 20px 50px rgba(16, 185, 129, 0.1);
+            margin: 1.5rem 0;
+            color: #F9FAFB;
+        }
     
-    4. **ACTIONABLE FINANCIAL PLAN**
-    - Monthly investment allocation
-    - Short-term and long-term goals
-    - Risk management strategies
+        .cost-cutting-card {
+            background: rgba(239, 68, 68, 0.1);
+            backdrop-filter: blur(20px);
+            border: 1px solid rgba(239, 68, 68, 0.3);
+            padding: 2rem;
+            border-radius: 20px;
+            box-shadow: 0 20px 50px rgba(239, 68, 68, 0.1);
+            margin: 1.5rem 0;
+            color: #F9FAFB;
+        }
     
-    Keep it practical, India-specific, and actionable. Use Indian financial terms and context.
-    """
+        .salary-card {
+            background: rgba(31, 41, 55, 0.9);
+            backdrop-filter: blur(25px);
+            border: 1px solid rgba(79, 70, 229, 0.3);
+            padding: 3rem;
+            border-radius: 25px;
+            text-align: center;
+            margin: 2rem 0;
+            box-shadow: 0 25px 70px rgba(79, 70, 229, 0.2);
+            color: #F9FAFB;
+        }
     
-    try:
-        api_key = st.secrets.get("GROQ_API_KEY")
-        
-        if not api_key or api_key == "your-groq-api-key-here":
-            return "Please add your Groq API key to .streamlit/secrets.toml"
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
+        .stButton > button {
+            background: linear-gradient(135deg, #4F46E5 0%, #9333EA 100%);
+            color: white;
+            border: none;
+            border-radius: 12px;
+            padding: 0.75rem 2rem;
+            font-weight: 600;
+            transition: all 0.3s ease;
+            box-shadow: 0 8px 25px rgba(79, 70, 229, 0.3);
+            font-family: 'Inter', sans-serif;
         }
-        
-        payload = {
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "model": "llama-3.1-8b-instant",
-            "max_tokens": 1000,
-            "temperature": 0.7
+        .stButton > button:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 12px 35px rgba(79, 70, 229, 0.4);
+            background: linear-gradient(135deg, #5B21B6 0%, #A855F7 100%);
         }
-        
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        else:
-            st.error(f"API Error: {response.status_code}")
-            return f"AI service temporarily unavailable. Basic analysis: You're saving ₹{savings:,.0f} ({savings_rate:.1f}%) from your ₹{salary:,.0f} salary. Consider investing in SIP and reducing spending in {max(categories, key=categories.get)}."
-    
-    except Exception as e:
-        st.error(f"Error: {str(e)}")
-        return f"AI analysis unavailable. Basic summary: Savings rate {savings_rate:.1f}%, total spending ₹{total_spending:,.0f} from ₹{salary:,.0f} salary."
-
-def create_premium_pie_chart(data):
-    """Create premium spending breakdown pie chart"""
-    if not data:
-        return go.Figure()
-    
-    categories = {}
-    for item in data:
-        categories[item['category']] = categories.get(item['category'], 0) + item['amount']
     
-    colors = ['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4', '#feca57', '#ff9ff3', '#54a0ff']
-    
-    fig = px.pie(
-        values=list(categories.values()),
-        names=list(categories.keys()),
-        title="💰 Monthly Spending Breakdown",
-        color_discrete_sequence=colors
-    )
-    fig.update_traces(
-        textposition='inside', 
-        textinfo='percent+label',
-        hovertemplate='<b>%{label}</b><br>Amount: ₹%{value:,.0f}<br>Percentage: %{percent}<extra></extra>'
-    )
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white', size=12, family="Poppins"),
-        title_font_size=16
-    )
-    return fig
-
-def create_savings_chart(data, salary):
-    """Create premium savings vs spending chart"""
-    if not data or salary == 0:
-        return go.Figure()
+        .sidebar .stSelectbox > div > div {
+            background: rgba(31, 41, 55, 0.8);
+            border: 1px solid rgba(75, 85, 99, 0.3);
+            border-radius: 12px;
+            color: #F9FAFB;
+        }
     
-    total_spending = sum(item['amount'] for item in data)
-    savings = salary - total_spending
+        .rupee-symbol {
+            color: #10B981;
+            font-weight: bold;
+        }
     
-    fig = go.Figure(data=[
-        go.Bar(
-            name='💸 Spending', 
-            x=['Monthly Budget'], 
-            y=[total_spending], 
-            marker_color='#ff6b6b',
-            text=[f'₹{total_spending:,.0f}'],
-            textposition='auto'
-        ),
-        go.Bar(
-            name='💰 Savings', 
-            x=['Monthly Budget'], 
-            y=[savings], 
-            marker_color='#4ecdc4',
-            text=[f'₹{savings:,.0f}'],
-            textposition='auto'
-        )
-    ])
+        .indian-flag {
+            background: linear-gradient(to right, #ff9933 33%, #ffffff 33%, #ffffff 66%, #138808 66%);
+            height: 4px;
+            width: 100%;
+            margin: 10px 0;
+            border-radius: 2px;
+        }
     
-    fig.update_layout(
-        title=f"📊 Monthly Budget Overview (₹{salary:,.0f} salary)",
-        barmode='stack',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white', family="Poppins"),
-        showlegend=True
-    )
-    return fig
+        .report-card {
+            background: rgba(31, 41, 55, 0.95);
+            backdrop-filter: blur(30px);
+            border: 1px solid rgba(79, 70, 229, 0.2);
+            padding: 2rem;
+            border-radius: 16px;
+            margin: 1rem 0;
+            color: #F9FAFB;
+            font-family: 'Inter', monospace;
+            white-space: pre-wrap;
+            max-height: 400px;
+            overflow-y: auto;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
 def main():
+    _setup_page()
+    
     # Main Header
     st.markdown("""
     <div class="main-header">
@@ -478,7 +377,7 @@ def main():
     
     # Initialize session state
     if 'financial_data' not in st.session_state:
-        st.session_state.financial_data = []
+        st.session_state.financial_data = None
     if 'salary' not in st.session_state:
         st.session_state.salary = 0
     if 'step' not in st.session_state:
@@ -519,6 +418,16 @@ def main():
     
     # Step 2: Expense Input and Analysis
     elif st.session_state.step == 2:
+        # The data layer (pandas, numpy) is first needed here
+        from finance_engine.store import TransactionStore
+        from finance_engine.columnar import COLUMNAR_EXTENSIONS
+        from finance_engine.ingest import load_text
+        from finance_engine.parse_cache import get_parse_cache
+        from finance_engine.exports import get_export
+        
+        if st.session_state.financial_data is None:
+            st.session_state.financial_data = TransactionStore.empty()
+        
         # Top bar with salary
         col1, col2 = st.columns([3, 1])
         with col1:
@@ -534,10 +443,12 @@ def main():
             
             input_method = st.selectbox(
                 "Choose input method:",
-                ["📝 Paste Text", "📄 Upload Excel/CSV", "📋 Upload PDF"]
+                ["📝 Paste Text", "📄 Upload Excel/CSV/Parquet/Arrow", "📋 Upload PDF"]
             )
             
-            df = pd.DataFrame()
+            parse_cache = get_parse_cache()
+            store = None
+            preview = None
             
             if input_method == "📝 Paste Text":
                 st.markdown("**Format: Category Amount**")
@@ -548,19 +459,20 @@ def main():
                 )
                 if text_input:
                     try:
-                        df = parse_text_input(text_input)
+                        store, preview = parse_cache.get_or_parse(
+                            text_input.encode('utf-8'), 'text', lambda: load_text(text_input)
+                        )
                         st.success("✅ Expenses parsed!")
                     except Exception as e:
                         st.error(f"Error: {e}")
             
-            elif input_method == "📄 Upload Excel/CSV":
-                uploaded_file = st.file_uploader("Upload your file", type=['csv', 'xlsx', 'xls'])
+            elif input_method == "📄 Upload Excel/CSV/Parquet/Arrow":
+                uploaded_file = st.file_uploader(
+                    "Upload your file", type=['csv', 'xlsx', 'xls'] + [ext.lstrip('.') for ext in COLUMNAR_EXTENSIONS]
+                )
                 if uploaded_file:
                     try:
-                        if uploaded_file.name.endswith('.csv'):
-                            df = pd.read_csv(uploaded_file)
-                        else:
-                            df = pd.read_excel(uploaded_file)
+                        store, preview = _load_cached_upload(parse_cache, uploaded_file)
                         st.success("✅ File uploaded!")
                     except Exception as e:
                         st.error(f"Error: {e}")
@@ -569,14 +481,17 @@ def main():
                 uploaded_file = st.file_uploader("Upload PDF file", type=['pdf'])
                 if uploaded_file:
                     try:
-                        df = parse_pdf(uploaded_file)
+                        store, preview = _load_cached_upload(parse_cache, uploaded_file)
                         st.success("✅ PDF processed!")
                     except Exception as e:
                         st.error(f"Error: {e}")
             
-            if not df.empty:
-                st.session_state.financial_data = normalize_data(df)
-                st.write("**Preview:**", df.head())
+            if store is not None and len(store):
+                # Only a new or changed input replaces the data, so quick adds and edits survive reruns
+                if store.version != st.session_state.get('source_version'):
+                    st.session_state.financial_data = store
+                    st.session_state.source_version = store.version
+                st.write("**Preview:**", preview)
             
             # Quick demo data
             if st.button("🎯 Load Indian Sample Data"):
@@ -589,15 +504,20 @@ def main():
                     {"category": "Dining Out", "amount": 6000, "date": "2025-01-08"},
                     {"category": "Shopping", "amount": 7000, "date": "2025-01-14"},
                 ]
-                st.session_state.financial_data = demo_data
+                st.session_state.financial_data = TransactionStore.from_records(demo_data)
                 st.rerun()
+            
+            _quick_add_form()
+            _history_panel(parse_cache)
         
         # Main Dashboard
-        if st.session_state.financial_data:
-            data = st.session_state.financial_data
-            total_spending = sum(item['amount'] for item in data)
-            savings = st.session_state.salary - total_spending
-            savings_rate = (savings / st.session_state.salary * 100) if st.session_state.salary > 0 else 0
+        if len(st.session_state.financial_data):
+            store = st.session_state.financial_data
+            start, end = _select_period(store)
+            summary = store.summary(st.session_state.salary, start, end)
+            total_spending = summary.total_spending
+            savings = summary.savings
+            savings_rate = summary.savings_rate
             
             # Premium Metrics
             col1, col2, col3, col4 = st.columns(4)
@@ -612,9 +532,10 @@ def main():
             
             with col2:
                 color = "#4ecdc4" if savings > 0 else "#ff6b6b"
+                savings_label = "Monthly Savings" if summary.months == 1 else f"Savings ({summary.months} months)"
                 st.markdown(f"""
                 <div class="metric-card">
-                    <h4>💰 Monthly Savings</h4>
+                    <h4>💰 {savings_label}</h4>
                     <h2 style="color: {color}">₹{savings:,.0f}</h2>
                 </div>
                 """, unsafe_allow_html=True)
@@ -636,7 +557,7 @@ def main():
                 """, unsafe_allow_html=True)
             
             with col4:
-                categories_count = len(set(item['category'] for item in data))
+                categories_count = summary.category_count
                 st.markdown(f"""
                 <div class="metric-card">
                     <h4>📂 Categories</h4>
@@ -647,17 +568,37 @@ def main():
             # Premium Charts
             col1, col2 = st.columns(2)
             
-            with col1:
-                st.plotly_chart(create_premium_pie_chart(data), use_container_width=True)
+            # Built once per data version, salary, period and theme; the pie keeps the top categories plus Other
+            with col1, stage("pie chart"):
+                st.plotly_chart(get_chart("pie", summary, _chart_theme()), use_container_width=True)
             
-            with col2:
-                st.plotly_chart(create_savings_chart(data, st.session_state.salary), use_container_width=True)
+            with col2, stage("savings chart"):
+                st.plotly_chart(get_chart("savings", summary, _chart_theme()), use_container_width=True)
             
             # Expenses Table
-            st.subheader("📋 Your Monthly Expenses")
-            df_display = pd.DataFrame(data)
-            df_display['amount'] = df_display['amount'].apply(lambda x: f"₹{x:,.0f}")
-            st.dataframe(df_display, use_container_width=True)
+            st.subheader("📋 Your Monthly Expenses" if summary.months == 1 else f"📋 Your Expenses, {summary.period}")
+            first_row, stop_row = store.rows_between(start, end) if start else (0, len(store))
+            with stage("expenses table", rows=stop_row - first_row):
+                df_display = store.to_frame(first_row, stop_row)
+                df_display['amount'] = df_display['amount'].apply(lambda x: f"₹{x:,.0f}")
+                # Keyed on the version so a stale selection never points at changed rows
+                table = st.dataframe(
+                    df_display,
+                    use_container_width=True,
+                    on_select="rerun",
+                    selection_mode="multi-row",
+                    key=f"expenses_table_{store.version}_{first_row}_{stop_row}"
+                )
+            
+            if table.selection.rows:
+                _edit_selected_rows(store, [first_row + row for row in table.selection.rows])
+            
+            # Drop AI analysis that was started for different data or salary
+            ai_job = st.session_state.get('ai_job')
+            if ai_job is not None and ai_job.key != _analysis_key(summary):
+                ai_job.cancel()
+                del st.session_state['ai_job']
+                ai_job = None
             
             # AI Analysis Section
             st.subheader("🤖 AI Financial Analysis & Investment Recommendations")
@@ -665,29 +606,24 @@ def main():
             col1, col2 = st.columns([3, 1])
             with col1:
                 if st.button("🧠 Generate Complete Financial Report", type="primary", use_container_width=True):
-                    with st.spinner("🔍 Analyzing your finances and generating comprehensive report..."):
-                        # Generate formatted report
-                        report = generate_financial_report(data, st.session_state.salary)
-                        
-                        # Store report in session state
-                        st.session_state.financial_report = report
-                        
-                        # Display report in a nice format
-                        st.markdown(f"""
-                        <div class="report-card">
-                            {report}
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Get AI insights for additional analysis
-                        ai_insights = get_ai_insights(data, st.session_state.salary)
-                        
-                        st.markdown(f"""
-                        <div class="insight-card">
-                            <h3>🤖 AI Analysis</h3>
-                            <div style="white-space: pre-wrap;">{ai_insights}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    # The local report is instant; the AI analysis fills in from a background job
+                    st.session_state.financial_report = generate_financial_report(summary)
+                    if ai_job is not None:
+                        ai_job.cancel()
+                    ai_job = _start_ai_analysis(summary)
+                    st.session_state.ai_job = ai_job
+                
+                if ai_job is not None:
+                    st.markdown(f"""
+                    <div class="report-card">
+                        {st.session_state.financial_report}
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    if ai_job.done:
+                        _render_ai_job(ai_job)
+                    else:
+                        _live_ai_card(ai_job)
             
             with col2:
                 st.markdown("""
@@ -714,24 +650,40 @@ def main():
                         "text/plain"
                     )
             
+            # Export bytes are built only when a download is clicked, once per data version
             with col2:
-                csv_data = pd.DataFrame(data).to_csv(index=False)
                 st.download_button(
                     "📄 Download CSV Data",
-                    csv_data,
+                    lambda: get_export(store, "csv"),
                     "expense_data.csv",
                     "text/csv"
                 )
             
             with col3:
-                excel_buffer = BytesIO()
-                pd.DataFrame(data).to_excel(excel_buffer, index=False)
                 st.download_button(
                     "📊 Download Excel Data",
-                    excel_buffer.getvalue(),
+                    lambda: get_export(store, "xlsx"),
                     "expense_data.xlsx",
                     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
+            
+            # Columnar copies load back without parsing (Arrow is memory-mapped as-is)
+            col4, col5, _ = st.columns(3)
+            with col4:
+                st.download_button(
+                    "🗃️ Download Parquet Data",
+                    lambda: get_export(store, "parquet"),
+                    "expense_data.parquet",
+                    "application/vnd.apache.parquet"
+                )
+            
+            with col5:
+                st.download_button(
+                    "🏹 Download Arrow Data",
+                    lambda: get_export(store, "arrow"),
+                    "expense_data.arrow",
+                    "application/vnd.apache.arrow.file"
+                )
         
         else:
             st.markdown("""
@@ -748,5 +700,51 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
+# Reruns kept for the diagnostics panel and its exports
+TRACE_HISTORY = 20
+
+def _diagnostics_enabled():
+    return TRACE_ENABLED or st.session_state.get('show_diagnostics', False)
+
+def _render_diagnostics(history):
+    """Opt-in sidebar panel with per-stage timings of recent reruns"""
+    with st.sidebar:
+        if not TRACE_ENABLED:
+            st.toggle("🛠️ Developer diagnostics", key='show_diagnostics')
+        if not history:
+            return
+        
+        latest = history[-1]
+        with st.expander("🛠️ Diagnostics", expanded=True):
+            st.caption(f"Last rerun: {latest.seconds * 1000:,.0f} ms across {len(latest.spans)} stages")
+            st.code("\n".join(latest.log_lines()[1:]), language=None)
+            
+            ai_job = st.session_state.get('ai_job')
+            if ai_job is not None and ai_job.timings:
+                st.caption("AI job: " + ", ".join(f"{event} {seconds:.2f}s" for event, seconds in ai_job.timings.items()))
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("JSON", lambda: traces_to_json(history), "traces.json", "application/json")
+            with col2:
+                st.download_button("Log", lambda: traces_to_log(history), "traces.log", "text/plain")
+
+def run():
+    """Run the app, tracing the rerun's stages when diagnostics are enabled"""
+    if not _diagnostics_enabled():
+        main()
+        _render_diagnostics(None)
+        return
+    
+    history = st.session_state.setdefault('traces', [])
+    trace = Trace(f"rerun (step {st.session_state.get('step', 1)})")
+    try:
+        with trace:
+            main()
+    finally:
+        history.append(trace)
+        del history[:-TRACE_HISTORY]
+    _render_diagnostics(history)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run()
\ No newline at end of file
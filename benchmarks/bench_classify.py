@@ -0,0 +1,62 @@
+"""Benchmark merchant classification of bank narrations in lines per second.
+
+Reports a cold pass (fresh classifier, every description scanned), a warm pass
+(memo populated) and, for reference, a plain loop testing every keyword with
+``in`` on a sample of the lines.
+
+Run from the repository root:
+
+    python benchmarks/bench_classify.py
+    python benchmarks/bench_classify.py --lines 100000 1000000 5000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finance_engine.classify import MERCHANT_KEYWORDS, MerchantClassifier
+from synthetic import narration_lines
+
+NAIVE_SAMPLE = 20_000
+
+
+def naive_classify(lines):
+    keywords = [(word, category) for category, words in MERCHANT_KEYWORDS.items() for word in words]
+    result = []
+    for line in lines:
+        text = line.lower()
+        result.append(next((category for word, category in keywords if word in text), None))
+    return result
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'lines':>10} {'pass':<8} {'seconds':>8} {'lines/sec':>12}  distinct -> categories")
+    for count in args.lines:
+        lines = narration_lines(count, args.seed)
+        classifier = MerchantClassifier()
+        cold = timed(classifier.classify_many, lines)
+        warm = timed(classifier.classify_many, lines)
+        categories = set(classifier.classify_many(lines))
+        sample = lines[:NAIVE_SAMPLE]
+        naive = timed(naive_classify, sample) * len(lines) / len(sample)
+        mapping = f"{len(set(lines)):,} -> {len(categories)}"
+        for name, seconds in (("cold", cold), ("warm", warm), ("naive*", naive)):
+            print(f"{count:>10,} {name:<8} {seconds:>8.3f} {count / seconds:>12,.0f}  {mapping}")
+    print(f"\n* naive is extrapolated from the first {NAIVE_SAMPLE:,} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare export/import round trips and file sizes for CSV, XLSX, Parquet and Arrow.
+
+Each format is written from the same store with ``get_export``'s builders and
+read back through ``load_upload`` (plus the memory-mapped path for Arrow), and
+the loaded rows are checked against the original.
+
+Run from the repository root:
+
+    python benchmarks/bench_formats.py
+    python benchmarks/bench_formats.py --rows 100000 1000000 --formats csv parquet arrow
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finance_engine.exports import EXPORT_BUILDERS
+from finance_engine.ingest import load_columnar, load_upload, store_from_raw
+from synthetic import make_frame
+
+# XLSX writing and reading is too slow to be worth timing past this
+XLSX_MAX_ROWS = 200_000
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _load_mapped(data):
+    path = os.path.join(tempfile.mkdtemp(prefix="finance-bench-"), "bench.arrow")
+    with open(path, "wb") as f:
+        f.write(data)
+    return lambda: load_columnar(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--formats", nargs="+", default=list(EXPORT_BUILDERS), choices=list(EXPORT_BUILDERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'format':<12} {'rows':>10} {'size (MB)':>10} {'B/row':>7} {'write (ms)':>11} {'read (ms)':>10}")
+    for rows in args.rows:
+        store, _ = store_from_raw(make_frame(rows))
+        expected = store.to_frame()
+        for fmt in args.formats:
+            if fmt == "xlsx" and rows > XLSX_MAX_ROWS:
+                continue
+            write, data = best_of(args.repeat, EXPORT_BUILDERS[fmt], store)
+            readers = [(fmt, lambda: load_upload(data, f"bench.{fmt}"))]
+            if fmt == "arrow":
+                readers.append(("arrow mmap", _load_mapped(data)))
+            for label, reader in readers:
+                read, (loaded, _) = best_of(args.repeat, reader)
+                # Category codes may be numbered differently, so compare the rows
+                if not loaded.to_frame().equals(expected):
+                    raise SystemExit(f"{label}: round trip changed the data")
+                print(f"{label:<12} {rows:>10,} {len(data) / 2**20:>10.2f} {len(data) / rows:>7.1f} "
+                      f"{write * 1000:>11.1f} {read * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark the statement line parser shared by text and PDF input, in lines per second.
+
+Times ``iter_line_batches`` alone and ``parse_text_input`` (which also
+classifies and builds the frame) on short typed lines ("Rent 25000") and on
+printed bank statement rows with dates, narrations, Dr markers and balances.
+
+Run from the repository root:
+
+    python benchmarks/bench_lines.py
+    python benchmarks/bench_lines.py --lines 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finance_engine.parsers import iter_line_batches, parse_text_input
+from synthetic import bank_statement_lines, make_text
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'input':<10} {'lines':>10} {'stage':<17} {'seconds':>8} {'lines/sec':>12}")
+    for count in args.lines:
+        inputs = {
+            "typed": make_text(count).split("\n"),
+            "statement": bank_statement_lines(count),
+        }
+        for name, lines in inputs.items():
+            text = "\n".join(lines)
+            stages = (
+                ("iter_line_batches", lambda: deque(iter_line_batches(lines), maxlen=0)),
+                ("parse_text_input", lambda: parse_text_input(text)),
+            )
+            for stage, run in stages:
+                seconds = best_of(args.repeat, run)
+                print(f"{name:<10} {count:>10,} {stage:<17} {seconds:>8.3f} {count / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Benchmark normalize_data on synthetic bank exports of increasing size.
+
+Run from the repository root:
+
+    python benchmarks/bench_normalize.py
+    python benchmarks/bench_normalize.py --rows 50000 100000 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finance_engine.ingest import normalize_data
+from synthetic import make_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[50_000, 100_000, 250_000, 500_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'best (s)':>10} {'us/row':>8}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            normalize_data(df)
+            best = min(best, time.perf_counter() - start)
+        print(f"{rows:>10,} {best:>10.3f} {best / rows * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
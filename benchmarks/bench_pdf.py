@@ -0,0 +1,54 @@
+"""Benchmark serial vs process-pool parse_pdf on synthetic multi-page statements.
+
+The pooled result is checked against the serial one, frame for frame. At
+least two workers are used, so the pooled path runs even on a single CPU.
+
+Run from the repository root:
+
+    python benchmarks/bench_pdf.py
+    python benchmarks/bench_pdf.py --pages 50 200 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_pdf
+
+
+def _time(parse_pdf, pdf_bytes, workers):
+    start = time.perf_counter()
+    frame = parse_pdf(BytesIO(pdf_bytes), workers=workers, min_parallel_pages=1)
+    return time.perf_counter() - start, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 100, 200])
+    parser.add_argument("--lines-per-page", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1),
+                        help="PDF pool size (sets FINANCE_BUDDY_PDF_WORKERS) and page ranges in flight per document")
+    args = parser.parse_args()
+
+    # The pool size is read when the parsers are imported
+    os.environ["FINANCE_BUDDY_PDF_WORKERS"] = str(args.workers)
+    from finance_engine.parsers import parse_pdf
+
+    # Warm the pool so worker start-up is not charged to the first size
+    _time(parse_pdf, make_pdf(2, 5), args.workers)
+
+    print(f"{'pages':>6} {'rows':>8} {'serial (s)':>11} {'parallel (s)':>13} {'speedup':>8}")
+    for pages in args.pages:
+        pdf_bytes = make_pdf(pages, args.lines_per_page)
+        serial, expected = _time(parse_pdf, pdf_bytes, 1)
+        parallel, frame = _time(parse_pdf, pdf_bytes, args.workers)
+        if not frame.equals(expected):
+            raise SystemExit(f"{pages} pages: pooled parse differs from the serial parse")
+        print(f"{pages:>6} {len(frame):>8,} {serial:>11.2f} {parallel:>13.2f} {serial / parallel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
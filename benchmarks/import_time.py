@@ -0,0 +1,95 @@
+"""Measure and guard the startup import cost of app_premium.
+
+Runs ``python -X importtime -c "import app_premium"`` in fresh interpreters,
+subtracts the cost of importing Streamlit on its own, and reports the slowest
+modules the app adds. Exits non-zero if the app's own import time exceeds the
+budget or a deferred heavy dependency is imported at startup, so it can run as
+a CI guard.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 150 --first-page
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that must only load when their feature is first used
+DEFERRED = ["pandas", "numpy", "plotly.express", "pdfplumber", "openpyxl", "requests"]
+
+
+def import_profile(statement):
+    """Return {module: (self_us, cumulative_us, depth)} from one -X importtime run"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        profile[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return profile
+
+
+def total_ms(profile):
+    return sum(cumulative for _, cumulative, depth in profile.values() if depth == 0) / 1000
+
+
+def first_page_seconds():
+    """Wall time for a fresh interpreter to import Streamlit and render step 1 via AppTest"""
+    code = (
+        "import time; start = time.perf_counter();"
+        "from streamlit.testing.v1 import AppTest;"
+        "at = AppTest.from_file('app_premium.py', default_timeout=60); at.run();"
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="slowest app-added modules to list")
+    parser.add_argument("--budget-ms", type=float, default=300.0,
+                        help="maximum import time the app may add on top of Streamlit")
+    parser.add_argument("--first-page", action="store_true", help="also time rendering step 1 with AppTest")
+    args = parser.parse_args()
+
+    baseline = [import_profile("import streamlit") for _ in range(args.runs)]
+    app = [import_profile("import app_premium") for _ in range(args.runs)]
+    baseline_ms = statistics.median(total_ms(p) for p in baseline)
+    app_ms = statistics.median(total_ms(p) for p in app)
+    added_ms = app_ms - baseline_ms
+
+    streamlit_modules = set(baseline[-1])
+    added = {name: v for name, v in app[-1].items() if name not in streamlit_modules}
+    print(f"streamlit alone:    {baseline_ms:8.1f} ms")
+    print(f"import app_premium: {app_ms:8.1f} ms")
+    print(f"added by the app:   {added_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print("\nSlowest modules added by the app (cumulative):")
+    for name, (_, cumulative, _) in sorted(added.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    if args.first_page:
+        times = [first_page_seconds() for _ in range(max(1, args.runs // 2))]
+        print(f"\nfirst page (AppTest, fresh interpreter): {statistics.median(times):.2f} s")
+
+    failures = [f"{name} is imported at startup" for name in DEFERRED if name in added]
+    if added_ms > args.budget_ms:
+        failures.append(f"app adds {added_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Load-test the app with many simulated sessions against a local stub LLM server.
+
+Each session is a Streamlit ``AppTest`` of ``app_premium.py`` walking the main
+flow: open the app, enter a salary, upload a CSV statement (which renders the
+dashboard), click Generate for the report and wait for the AI analysis to
+finish streaming. Sessions run concurrently on threads in this process, so
+they share the app's process-wide caches, LLM client and AI job pool the way
+sessions of one Streamlit server do. AppTest cannot execute two script runs
+at once in one process, so runs take turns on a lock, much as reruns of one
+server contend for the GIL; the AI requests and streaming overlap freely.
+AI requests go to ``stub_llm.py`` started in-process, with configurable
+latency, error rate and streaming.
+
+Reports p50/p95/p99 latency per step and for the whole flow, sessions per
+second, memory per session (RSS growth while every session is held open) and
+the stub, LLM client and request-coalescing counters.
+
+Run from the repository root:
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --sessions 200 --concurrency 50 --rows 2000 --latency 1.5 --error-rate 0.05
+    python benchmarks/load_test.py --sessions 100 --same-data --output load.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import synthetic  # noqa: E402
+from stub_llm import start_stub  # noqa: E402
+
+APP = os.path.join(ROOT, "app_premium.py")
+SALARY = 85000
+STEPS = ("open", "salary", "upload", "report", "ai", "flow")
+
+# Held for every AppTest script run; time spent waiting for it counts towards the step
+_RUN_LOCK = threading.Lock()
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    """Current resident set size of this process (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_session(number, upload, args):
+    """Walk one session through the flow; returns (AppTest, {step: seconds}, error or None)"""
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    at = None
+    started = time.perf_counter()
+
+    def step(name, action, locked=True):
+        start = time.perf_counter()
+        if locked:
+            with _RUN_LOCK:
+                action()
+        else:
+            action()
+        timings[name] = time.perf_counter() - start
+        if at is not None and len(at.exception):
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+
+    try:
+        def open_app():
+            nonlocal at
+            at = AppTest.from_file(APP, default_timeout=args.timeout)
+            at.secrets["GROQ_API_KEY"] = "stub-key"
+            at.run()
+
+        def enter_salary():
+            at.number_input[0].set_value(float(SALARY))
+            at.button[0].click().run()
+
+        def upload_statement():
+            at.selectbox[0].select("📄 Upload Excel/CSV/Parquet/Arrow").run()
+            at.file_uploader[0].set_value((f"statement-{number}.csv", upload, "text/csv")).run()
+            if not len(at.session_state.financial_data):
+                raise RuntimeError("upload: no transactions loaded")
+
+        def generate_report():
+            [button for button in at.button if "Generate" in button.label][0].click().run()
+
+        def wait_for_ai():
+            job = at.session_state.ai_job
+            if not job.wait(args.timeout):
+                raise RuntimeError("ai: analysis did not finish in time")
+            with _RUN_LOCK:
+                at.run()
+            if job.errors:
+                raise RuntimeError(f"ai: {job.errors[0]}")
+
+        step("open", open_app)
+        step("salary", enter_salary)
+        step("upload", upload_statement)
+        step("report", generate_report)
+        step("ai", wait_for_ai, locked=False)
+        timings["flow"] = time.perf_counter() - started
+        return at, timings, None
+    except Exception as e:
+        if args.verbose:
+            traceback.print_exc()
+        return at, timings, f"{type(e).__name__}: {e}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50, help="sessions running at the same time")
+    parser.add_argument("--rows", type=int, default=1000, help="transactions per uploaded statement")
+    parser.add_argument("--same-data", action="store_true",
+                        help="every session uploads the same statement (exercises the parse cache and coalescing)")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub seconds before each response starts")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub requests failing with 429/503")
+    parser.add_argument("--chunks", type=int, default=20, help="streamed pieces per stub response")
+    parser.add_argument("--chunk-interval", type=float, default=0.02)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per app run or AI analysis")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="print tracebacks of failed sessions")
+    args = parser.parse_args()
+
+    stub = start_stub(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        chunks=args.chunks, chunk_interval=args.chunk_interval
+    )
+    # Read when the engine modules are first imported, which happens in the first session
+    os.environ["GROQ_API_BASE"] = stub.base_url
+    os.environ["FINANCE_BUDDY_LLM_CACHE"] = ":memory:"
+    os.environ.setdefault("FINANCE_BUDDY_STORAGE_PATH", os.path.join(tempfile.mkdtemp(prefix="finance-load-"), "history"))
+
+    uploads = [synthetic.make_csv(args.rows, 0 if args.same_data else seed) for seed in range(args.sessions)]
+    print(f"{args.sessions} sessions, {args.concurrency} at a time, {args.rows:,} rows each; stub at {stub.base_url}")
+
+    # One session first, so imports and one-off start-up are not charged to the measured run
+    run_session(-1, synthetic.make_csv(10, 10**6), args)
+    from finance_engine.insights import prompt_metrics
+    from finance_engine.llm_cache import get_response_cache
+    from finance_engine.llm_client import get_llm_client
+    from finance_engine.single_flight import get_single_flight
+
+    baseline = {
+        "stub": stub.stats(),
+        "coalescing": get_single_flight().metrics(),
+        "response_cache": get_response_cache().stats(),
+    }
+    rss_before = rss_bytes()
+    results = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(run_session, number, upload, args) for number, upload in enumerate(uploads)]
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+    # Every AppTest is still referenced, so this is the memory the open sessions hold
+    rss_after = rss_bytes()
+
+    errors = [error for _, _, error in results if error]
+    completed = [timings for _, timings, error in results if not error]
+    steps = {}
+    print(f"\n{'step':<8} {'n':>5} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    for name in STEPS:
+        values = sorted(timings[name] for _, timings, _ in results if name in timings)
+        if not values:
+            continue
+        steps[name] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+        row = steps[name]
+        print(f"{name:<8} {len(values):>5} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} "
+              f"{row['p99_ms']:>10.1f} {row['max_ms']:>10.1f}")
+
+    stub_stats = {key: value - baseline["stub"][key] for key, value in stub.stats().items()}
+    coalescing = get_single_flight().metrics()
+    coalescing = {key: value - baseline["coalescing"].get(key, 0) if key != "in_flight" else value
+                  for key, value in coalescing.items()}
+    cache_hits = get_response_cache().stats()["hits"] - baseline["response_cache"]["hits"]
+    summary = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "rows": args.rows,
+        "same_data": args.same_data,
+        "stub": {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+                 "chunks": args.chunks, "chunk_interval": args.chunk_interval, **stub_stats},
+        "completed": len(completed),
+        "errors": len(errors),
+        "wall_seconds": wall,
+        "sessions_per_second": len(completed) / wall if wall else None,
+        "rss_per_session_bytes": (rss_after - rss_before) / max(len(results), 1),
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "steps": steps,
+        "coalescing": coalescing,
+        "response_cache_hits": cache_hits,
+        "llm_client": get_llm_client(stub.base_url).metrics(),
+        "prompts": prompt_metrics(),
+    }
+
+    print(f"\ncompleted {len(completed)}/{len(results)} sessions in {wall:.1f}s "
+          f"({summary['sessions_per_second']:.2f} sessions/s)")
+    print(f"memory: {summary['rss_per_session_bytes'] / 2**20:.1f} MB RSS per open session, "
+          f"peak {summary['peak_rss_bytes'] / 2**20:.0f} MB")
+    print(f"stub: {stub_stats['requests']} requests ({stub_stats['streams']} streamed, {stub_stats['errors']} failed); "
+          f"coalesced {coalescing['coalesced']} of {coalescing['calls']} AI calls, {cache_hits} answered from cache")
+    for error in sorted(set(errors))[:10]:
+        print(f"  error x{errors.count(error)}: {error}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"results written to {args.output}")
+    stub.shutdown()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
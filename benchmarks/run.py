@@ -0,0 +1,353 @@
+"""Benchmark suite for the parsing, summary, report, chart and export hot paths.
+
+Times each case on synthetic statements of increasing size, reports throughput
+and peak traced memory, and writes the results as JSON so two runs (e.g. before
+and after a change) can be compared.
+
+Run from the repository root:
+
+    python benchmarks/run.py
+    python benchmarks/run.py --sizes 100 10000 1000000 10000000 --only parse_text_input normalize_data
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+    python benchmarks/run.py --compare before.json after.json
+
+Compare mode exits non-zero if any case got slower than ``--threshold``.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from functools import cached_property
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import synthetic  # noqa: E402
+
+SALARY = 85000
+PDF_LINES_PER_PAGE = 50
+
+
+class Inputs:
+    """Synthetic inputs for one size, generated on first use and shared by every case"""
+
+    def __init__(self, rows, seed):
+        self.rows = rows
+        self.seed = seed
+
+    @cached_property
+    def frame(self):
+        return synthetic.make_frame(self.rows, self.seed)
+
+    @cached_property
+    def text(self):
+        return synthetic.make_text(self.rows, self.seed)
+
+    @cached_property
+    def narrations(self):
+        return synthetic.narration_lines(self.rows, self.seed)
+
+    @cached_property
+    def statement(self):
+        return "\n".join(synthetic.bank_statement_lines(self.rows, self.seed))
+
+    @cached_property
+    def csv(self):
+        return synthetic.make_csv(self.rows, self.seed)
+
+    @cached_property
+    def xlsx(self):
+        return synthetic.make_xlsx(self.rows, self.seed)
+
+    @cached_property
+    def parquet(self):
+        from finance_engine.exports import build_parquet
+        return build_parquet(self.store)
+
+    @cached_property
+    def arrow(self):
+        from finance_engine.exports import build_arrow
+        return build_arrow(self.store)
+
+    @cached_property
+    def pdf(self):
+        pages = max(1, -(-self.rows // PDF_LINES_PER_PAGE))
+        return synthetic.make_pdf(pages, PDF_LINES_PER_PAGE, self.seed)
+
+    @cached_property
+    def store(self):
+        from finance_engine.ingest import store_from_raw
+        store, _ = store_from_raw(self.frame)
+        return store
+
+    @cached_property
+    def summary(self):
+        return self.store.summary(SALARY)
+
+    @cached_property
+    def merchant_summary(self):
+        """Summary of raw statement rows with one category per merchant (about one per ten rows)"""
+        import numpy as np
+        from finance_engine.store import TransactionStore
+        merchants = max(1, self.rows // 10)
+        store = self.store
+        codes = np.arange(len(store)) % merchants
+        names = [f"MERCHANT {i}" for i in range(merchants)]
+        return TransactionStore.from_columns(store.amounts, codes, names, store.dates).summary(SALARY)
+
+
+def _fresh_summary(store):
+    # A new store over the same arrays, so the cached totals are not reused
+    from finance_engine.store import TransactionStore
+    return TransactionStore(store.amounts, store.category_codes, store.categories, store.dates).summary(SALARY)
+
+
+def _append_batches(store, batches=100, rows=10):
+    # Successive small appends of new (latest-dated) rows onto a large history, as quick add does
+    frame = synthetic.make_frame(rows, seed=1).rename(columns=str.lower).assign(date="2025-01-01")
+    for _ in range(batches):
+        store = store.append(frame)
+    return store
+
+
+def _saved(backend_class, store):
+    # A fresh backend in a scratch directory holding just this store
+    path = os.path.join(tempfile.mkdtemp(prefix="finance-bench-"), "history")
+    backend = backend_class(path)
+    backend.save("bench", store)
+    return backend
+
+
+def _arrow_file(inputs):
+    # The Arrow export on disk, for the memory-mapped load path
+    path = os.path.join(tempfile.mkdtemp(prefix="finance-bench-"), "history.arrow")
+    with open(path, "wb") as f:
+        f.write(inputs.arrow)
+    return path
+
+
+def _cases():
+    """name -> (prepare(inputs) -> arg, run(arg), row cap or None, scales with rows)"""
+    import plotly.io
+    from finance_engine.charts import create_premium_pie_chart, create_savings_chart, get_chart
+    from finance_engine.classify import MerchantClassifier
+    from finance_engine.exports import build_arrow, build_csv, build_excel, build_parquet
+    from finance_engine.insights import build_insights_prompt
+    from finance_engine.ingest import load_columnar, load_upload, normalize_data
+    from finance_engine.parsers import parse_pdf, parse_text_input
+    from finance_engine.report import generate_financial_report
+    from finance_engine.storage import ParquetStorage, SQLiteStorage
+
+    return {
+        "parse_text_input": (lambda i: i.text, parse_text_input, None, True),
+        "parse_statement_text": (lambda i: i.statement, lambda text: parse_text_input(text, typed=False), None, True),
+        "parse_pdf": (lambda i: i.pdf, lambda pdf: parse_pdf(BytesIO(pdf)), 20_000, True),
+        "classify_narrations": (lambda i: i.narrations, lambda lines: MerchantClassifier().classify_many(lines), None, True),
+        "normalize_data": (lambda i: i.frame, normalize_data, None, True),
+        "load_upload_csv": (lambda i: i.csv, lambda data: load_upload(data, "bench.csv"), None, True),
+        "load_upload_xlsx": (lambda i: i.xlsx, lambda data: load_upload(data, "bench.xlsx"), 1_000_000, True),
+        "load_upload_parquet": (lambda i: i.parquet, lambda data: load_upload(data, "bench.parquet"), None, True),
+        "load_upload_arrow": (lambda i: i.arrow, lambda data: load_upload(data, "bench.arrow"), None, True),
+        "load_arrow_mmap": (_arrow_file, load_columnar, None, True),
+        "store_summary": (lambda i: i.store, _fresh_summary, None, True),
+        "store_append_100x10": (lambda i: i.store, lambda store: _append_batches(store).summary(SALARY), None, True),
+        "generate_financial_report": (lambda i: i.summary, generate_financial_report, None, False),
+        "build_insights_prompt": (lambda i: i.summary, build_insights_prompt, None, False),
+        "create_premium_pie_chart": (lambda i: i.summary, create_premium_pie_chart, None, False),
+        "create_savings_chart": (lambda i: i.summary, create_savings_chart, None, False),
+        "pie_chart_json_merchants": (lambda i: i.merchant_summary, lambda summary: plotly.io.to_json(
+            create_premium_pie_chart(summary), validate=False), None, True),
+        "pie_chart_cached_json": (lambda i: i.merchant_summary, lambda summary: plotly.io.to_json(
+            get_chart("pie", summary), validate=False), None, True),
+        "export_csv": (lambda i: i.store, build_csv, None, True),
+        "export_excel": (lambda i: i.store, build_excel, 1_000_000, True),
+        "export_parquet": (lambda i: i.store, build_parquet, None, True),
+        "export_arrow": (lambda i: i.store, build_arrow, None, True),
+        "storage_sqlite_load": (lambda i: _saved(SQLiteStorage, i.store), lambda b: b.load("bench"), 1_000_000, True),
+        "storage_sqlite_summary": (lambda i: _saved(SQLiteStorage, i.store), lambda b: b.summary("bench", SALARY), 1_000_000, True),
+        "storage_parquet_load": (lambda i: _saved(ParquetStorage, i.store), lambda b: b.load("bench"), None, True),
+        "storage_parquet_summary": (lambda i: _saved(ParquetStorage, i.store), lambda b: b.summary("bench", SALARY), None, True),
+    }
+
+
+def time_case(run, arg, repeat, max_seconds):
+    """Best wall time over up to `repeat` runs, stopping early once `max_seconds` is spent"""
+    best = float("inf")
+    spent = 0.0
+    runs = 0
+    while runs < repeat and (runs == 0 or spent < max_seconds):
+        start = time.perf_counter()
+        run(arg)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best, runs
+
+
+def peak_memory_mb(run, arg):
+    """Peak traced allocation (Python objects and numpy buffers) during one run"""
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def run_suite(sizes, only, repeat, max_seconds, memory, seed, log):
+    cases = _cases()
+    if only:
+        unknown = sorted(set(only) - set(cases))
+        if unknown:
+            raise SystemExit(f"unknown cases: {', '.join(unknown)} (choose from {', '.join(cases)})")
+        cases = {name: case for name, case in cases.items() if name in only}
+
+    results = []
+    summary_done = set()
+    for rows in sizes:
+        inputs = Inputs(rows, seed)
+        for name, (prepare, run, cap, scales) in cases.items():
+            if cap is not None and rows > cap:
+                log(f"{name:<26} {rows:>11,}  skipped (over {cap:,} row cap)")
+                continue
+            if not scales:
+                # Summary-driven cases only depend on the category count, so one size is enough
+                if name in summary_done:
+                    continue
+                summary_done.add(name)
+            arg = prepare(inputs)
+            run(arg)  # warm-up: imports, pools and first-call caches stay out of the timing
+            seconds, runs = time_case(run, arg, repeat, max_seconds)
+            result = {
+                "case": name,
+                "rows": rows if scales else None,
+                "seconds": seconds,
+                "runs": runs,
+                "rows_per_sec": rows / seconds if scales and seconds > 0 else None,
+                "peak_mb": peak_memory_mb(run, arg) if memory else None,
+            }
+            results.append(result)
+            log(format_result(result))
+        del inputs
+    return results
+
+
+def format_result(result):
+    rows = f"{result['rows']:>11,}" if result["rows"] is not None else f"{'-':>11}"
+    throughput = f"{result['rows_per_sec']:>14,.0f}" if result["rows_per_sec"] else f"{'-':>14}"
+    peak = f"{result['peak_mb']:>9.2f}" if result["peak_mb"] is not None else f"{'-':>9}"
+    return f"{result['case']:<26} {rows}  {result['seconds'] * 1000:>10.2f} {throughput} {peak}"
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import numpy
+    import pandas
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Print per-case time changes; return the cases slower than `threshold`"""
+    old = {(r["case"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<26} {'rows':>11}  {'old (ms)':>10} {'new (ms)':>10} {'change':>8}")
+    for result in current["results"]:
+        key = (result["case"], result["rows"])
+        if key not in old:
+            continue
+        before, after = old[key]["seconds"], result["seconds"]
+        change = after / before - 1 if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  slower"
+            regressions.append(key)
+        elif change < -threshold:
+            flag = "  faster"
+        rows = f"{key[1]:>11,}" if key[1] is not None else f"{'-':>11}"
+        print(f"{key[0]:<26} {rows}  {before * 1000:>10.2f} {after * 1000:>10.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000],
+                        help="row counts to generate (the suite supports up to 10,000,000)")
+    parser.add_argument("--only", nargs="+", help="run only these cases")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    parser.add_argument("--max-seconds", type=float, default=5.0,
+                        help="stop repeating a case once this much time is spent on it")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="baseline results to compare this run against, or two files to compare without running")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression (default 0.10)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(_cases()))
+        return 0
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline file, or a baseline and a current file")
+
+    if args.compare and len(args.compare) == 2:
+        current = _load(args.compare[1])
+    else:
+        print(f"{'case':<26} {'rows':>11}  {'best (ms)':>10} {'rows/sec':>14} {'peak (MB)':>9}")
+        results = run_suite(
+            args.sizes, args.only, args.repeat, args.max_seconds, not args.no_memory, args.seed,
+            lambda line: print(line, flush=True)
+        )
+        current = {"environment": environment(), "results": results}
+        output = args.output or os.path.join(
+            ROOT, "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nresults written to {output}")
+
+    if args.compare:
+        regressions = compare(_load(args.compare[0]), current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the {args.threshold:.0%} threshold")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
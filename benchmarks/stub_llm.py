@@ -0,0 +1,165 @@
+"""Local stand-in for the Groq chat-completions endpoint, for load tests.
+
+Answers ``POST .../chat/completions`` with a canned analysis after a
+configurable delay, streams it as server-sent events when the request asks for
+``stream``, and fails a configurable fraction of requests with 429 or 503 so
+retries and fallbacks are exercised. Point the app at it with
+``GROQ_API_BASE``:
+
+    python benchmarks/stub_llm.py --port 8765 --latency 0.8 --error-rate 0.05
+    GROQ_API_BASE=http://127.0.0.1:8765/v1 streamlit run app_premium.py
+
+``load_test.py`` starts one in-process.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYSIS = (
+    "1. **FINANCIAL HEALTH ASSESSMENT**\n- Spending is concentrated in rent and groceries.\n\n"
+    "2. **INDIAN INVESTMENT RECOMMENDATIONS**\n- Start a ₹10,000 monthly SIP in a Nifty 50 index fund.\n\n"
+    "3. **COST-CUTTING STRATEGIES**\n- Cap dining out and shopping at 10% of income.\n\n"
+    "4. **ACTIONABLE FINANCIAL PLAN**\n- Build a six-month emergency fund before adding equity.\n"
+)
+
+
+class StubSettings:
+    """Behaviour of the stub server; attributes may be changed while it runs"""
+
+    def __init__(self, latency=0.5, jitter=0.2, error_rate=0.0, chunks=20, chunk_interval=0.02, text=ANALYSIS):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunks = chunks
+        self.chunk_interval = chunk_interval
+        self.text = text
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering chat completions from StubSettings, with request counters"""
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), settings=None):
+        super().__init__(address, _Handler)
+        self.settings = settings or StubSettings()
+        self.requests = 0
+        self.streams = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, stream=False, error=False):
+        with self._lock:
+            self.requests += 1
+            self.streams += bool(stream)
+            self.errors += bool(error)
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "streams": self.streams, "errors": self.errors}
+
+
+def _split(text, parts):
+    """text cut into about `parts` pieces, on word boundaries"""
+    words = text.split(" ")
+    step = max(1, -(-len(words) // parts))
+    pieces = [" ".join(words[i:i + step]) for i in range(0, len(words), step)]
+    return [piece + " " for piece in pieces[:-1]] + pieces[-1:]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+        settings = self.server.settings
+        stream = bool(request.get("stream"))
+        time.sleep(max(0.0, settings.latency + random.uniform(-settings.jitter, settings.jitter)))
+
+        if random.random() < settings.error_rate:
+            self.server.count(stream, error=True)
+            status = random.choice((429, 503))
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0.5")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.server.count(stream)
+        if not stream:
+            self._send_json(200, {"choices": [{"index": 0, "message": {"role": "assistant", "content": settings.text}}]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for piece in _split(settings.text, settings.chunks):
+            event = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(settings.chunk_interval)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stub(port=0, **settings):
+    """Start a stub server on a background thread and return it (``base_url`` is its API base)"""
+    server = StubLLMServer(("127.0.0.1", port), StubSettings(**settings))
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the response starts")
+    parser.add_argument("--jitter", type=float, default=0.2, help="uniform +/- seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 429/503")
+    parser.add_argument("--chunks", type=int, default=20, help="streamed pieces per response")
+    parser.add_argument("--chunk-interval", type=float, default=0.02, help="seconds between streamed pieces")
+    args = parser.parse_args()
+
+    server = StubLLMServer(("127.0.0.1", args.port), StubSettings(
+        args.latency, args.jitter, args.error_rate, args.chunks, args.chunk_interval
+    ))
+    print(f"stub chat-completions server at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(server.stats())
+
+
+if __name__ == "__main__":
+    main()
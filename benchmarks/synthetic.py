@@ -0,0 +1,153 @@
+"""Reproducible synthetic statements for the benchmarks.
+
+Every generator takes a row count and a seed and returns the same data for the
+same arguments, from a few hundred rows up to tens of millions.
+"""
+import random
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+MERCHANTS = [
+    "Rent", "Groceries", "Transport", "Utilities", "Entertainment", "Dining Out", "Shopping",
+    "Swiggy Order", "Amazon Pay", "Uber Ride", "BigBasket", "Electricity Bill", "Netflix",
+]
+
+# Merchant names as they appear in bank narrations, including ones no keyword covers
+NARRATION_MERCHANTS = [
+    "SWIGGY", "ZOMATO LTD", "BIGBASKET", "BLINKIT", "DMART", "AMAZON PAY INDIA", "FLIPKART INTERNET",
+    "UBER INDIA", "OLA CABS", "RAPIDO", "IRCTC", "MAKEMYTRIP", "NETFLIX COM", "SPOTIFY INDIA", "BOOKMYSHOW",
+    "APOLLO PHARMACY", "TATA 1MG", "CULTFIT", "BESCOM", "AIRTEL PAYMENTS", "JIO PREPAID", "INDIAN OIL",
+    "HPCL FUEL", "ZERODHA BROKING", "LIC OF INDIA", "BAJAJ FINANCE LTD", "STARBUCKS", "DOMINOS PIZZA",
+    "RAMESH KIRANA STORE", "SHARMA TAILORS", "GREEN LEAF PLANT NURSERY", "CITY DENTAL CARE", "A1 XEROX",
+]
+_NARRATION_CITIES = ["MUMBAI", "BENGALURU", "DELHI", "PUNE", "CHENNAI", "HYDERABAD"]
+_NARRATION_BANKS = ["icici", "hdfcbank", "ybl", "okaxis", "paytm"]
+
+
+def narration_lines(count, seed=0):
+    """Return `count` bank-statement descriptions (UPI, POS, NEFT, ACH, ATM) with reference numbers"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        merchant = rng.choice(NARRATION_MERCHANTS)
+        kind = rng.random()
+        ref = rng.randint(10**11, 10**12 - 1)
+        if kind < 0.5:
+            handle = merchant.split()[0].lower()
+            lines.append(f"UPI/{ref}/{merchant}/{handle}@{rng.choice(_NARRATION_BANKS)}")
+        elif kind < 0.75:
+            lines.append(f"POS {rng.randint(1000, 9999)} {merchant} {rng.choice(_NARRATION_CITIES)}")
+        elif kind < 0.9:
+            lines.append(f"ACH D- {merchant}-{ref}")
+        elif kind < 0.97:
+            lines.append(f"NEFT-HDFC{rng.randint(10**6, 10**7 - 1)}-{merchant}")
+        else:
+            lines.append(f"ATM WDL {ref} {rng.choice(_NARRATION_CITIES)}")
+    return lines
+
+
+def bank_statement_lines(count, seed=0):
+    """Return `count` printed statement rows: date, narration, debit with Dr and running balance"""
+    rng = random.Random(seed)
+    narrations = narration_lines(count, seed)
+    days = pd.date_range("2024-01-01", periods=365).strftime("%d/%m/%Y").tolist()
+    balance = 5_00_000.0
+    lines = []
+    for narration in narrations:
+        amount = rng.randint(5000, 5_000_000) / 100
+        balance = max(balance - amount, 0.0) + (1_00_000 if balance < amount else 0)
+        lines.append(f"{rng.choice(days)} {narration} {amount:,.2f} Dr {balance:,.2f}")
+    return lines
+
+
+def statement_lines(count, seed=0):
+    """Yield `count` "<merchant> <amount>" statement lines"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield f"{rng.choice(MERCHANTS)} {rng.randint(50, 50000)}"
+
+
+def make_frame(rows, seed=0):
+    """Raw Category/Amount/Date frame shaped like an uploaded bank export"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=365).strftime("%Y-%m-%d").to_numpy()
+    return pd.DataFrame({
+        "Category": np.asarray(MERCHANTS, dtype=object)[rng.integers(0, len(MERCHANTS), rows)],
+        "Amount": rng.integers(50, 50000, rows),
+        "Date": dates[rng.integers(0, len(dates), rows)],
+    })
+
+
+def make_text(rows, seed=0):
+    """Pasted-statement text blob of "<merchant> <amount>" lines"""
+    frame = make_frame(rows, seed)
+    return "\n".join(frame["Category"] + " " + frame["Amount"].astype(str))
+
+
+def make_csv(rows, seed=0):
+    """CSV upload bytes"""
+    return make_frame(rows, seed).to_csv(index=False).encode("utf-8")
+
+
+def make_xlsx(rows, seed=0):
+    """XLSX upload bytes, written row-streamed so large sizes stay cheap to build"""
+    from openpyxl import Workbook
+
+    frame = make_frame(rows, seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(list(frame.columns))
+    for row in frame.itertuples(index=False):
+        sheet.append([row.Category, int(row.Amount), row.Date])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages, lines_per_page=50, seed=0):
+    """Build a multi-page text PDF of statement lines and return its bytes.
+
+    Written by hand with one Helvetica text object per page so the benchmarks
+    need no PDF authoring dependency; pdfplumber extracts it like a real
+    statement.
+    """
+    lines = statement_lines(pages * lines_per_page, seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for _ in range(pages):
+        body = ["BT /F1 10 Tf 14 TL 50 800 Td"]
+        for _ in range(lines_per_page):
+            body.append(f"({_pdf_escape(next(lines))}) Tj T*")
+        body.append("ET")
+        stream = "\n".join(body).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % ref for ref in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
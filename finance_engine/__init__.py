@@ -0,0 +1,65 @@
+"""Headless finance engine behind AI Finance Buddy.
+
+Parsing, normalization, summaries, the text report and the LLM client, with no
+Streamlit dependency, so the same code runs in the app, batch jobs and
+benchmarks. Public names are re-exported here lazily: importing the package is
+cheap, and pandas, numpy and friends load only when a name that needs them is
+first used.
+"""
+import importlib
+
+_EXPORTS = {
+    "EngineConfig": "config",
+    "TransactionStore": "store",
+    "TransactionStoreBuilder": "store",
+    "FinancialSummary": "store",
+    "parse_text_input": "parsers",
+    "parse_pdf": "parsers",
+    "MerchantClassifier": "classify",
+    "get_classifier": "classify",
+    "normalize_frame": "ingest",
+    "normalize_data": "ingest",
+    "load_text": "ingest",
+    "load_upload": "ingest",
+    "read_statement_chunked": "ingest",
+    "load_columnar": "ingest",
+    "get_parse_cache": "parse_cache",
+    "generate_financial_report": "report",
+    "build_insights_prompt": "insights",
+    "prepare_insights_prompt": "insights",
+    "prompt_metrics": "insights",
+    "request_ai_insights": "insights",
+    "stream_ai_insights": "insights",
+    "LLMClient": "llm_client",
+    "LLMError": "llm_client",
+    "get_llm_client": "llm_client",
+    "get_response_cache": "llm_cache",
+    "SingleFlight": "single_flight",
+    "get_single_flight": "single_flight",
+    "start_ai_job": "ai_jobs",
+    "get_export": "exports",
+    "get_chart": "charts",
+    "get_storage": "storage",
+    "history_owner": "storage",
+    "new_history_key": "storage",
+    "SQLiteStorage": "storage",
+    "ParquetStorage": "storage",
+    "Trace": "tracing",
+    "stage": "tracing",
+    "traced": "tracing",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,92 @@
+"""Background AI analysis jobs.
+
+The Groq call runs on a process-wide thread pool so the calling thread (the
+Streamlit script run, say) can render the local report immediately. Each job
+accumulates streamed text for the caller to poll, and can be cancelled when
+the session's data changes.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+AI_JOB_WORKERS = int(os.environ.get("FINANCE_BUDDY_AI_WORKERS", "32"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class AIJob:
+    """One in-flight AI analysis whose text fills in as chunks arrive"""
+
+    def __init__(self, key):
+        self.key = key
+        self.errors = []
+        self.future = None
+        # Seconds from submission: "started", "first_chunk" and "finished"
+        self.timings = {}
+        self._created = time.perf_counter()
+        self._chunks = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def text(self):
+        with self._lock:
+            return "".join(self._chunks)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop the job; a running stream is closed at the next chunk"""
+        self._cancelled.set()
+        if self.future is not None and self.future.cancel():
+            self._done.set()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def _mark(self, event):
+        self.timings.setdefault(event, time.perf_counter() - self._created)
+
+    def _run(self, make_stream):
+        self._mark("started")
+        stream = None
+        try:
+            stream = make_stream(self.errors.append)
+            for chunk in stream:
+                if self._cancelled.is_set():
+                    break
+                self._mark("first_chunk")
+                with self._lock:
+                    self._chunks.append(chunk)
+        except Exception as e:
+            self.errors.append(f"Error: {e}")
+        finally:
+            if stream is not None:
+                stream.close()
+            self._mark("finished")
+            self._done.set()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=AI_JOB_WORKERS, thread_name_prefix="ai-insights")
+        return _executor
+
+
+def start_ai_job(key, make_stream):
+    """Run make_stream(report_error) on the pool and collect its text into a new AIJob"""
+    job = AIJob(key)
+    job.future = _get_executor().submit(job._run, make_stream)
+    return job
@@ -0,0 +1,247 @@
+"""Batch report generation for directories of statement files.
+
+Usage:
+
+    python -m finance_engine.batch statements/ --salary 85000 -o reports/
+    python -m finance_engine.batch "exports/**/*.csv" --salaries salaries.csv -o reports/ --workers 8
+
+Each input (CSV, XLSX/XLS, PDF, Parquet, Arrow IPC or plain-text .txt) produces
+``<name>.report.txt`` and ``<name>.normalized.csv`` in the output directory,
+plus a ``<name>.meta.json`` recording what it was built from. ``<name>`` is
+the input's path relative to its directory argument, or to the fixed leading
+directories of its glob pattern, extension included: ``c1/stmt.csv`` gives
+``c1/stmt.csv.report.txt``. Inputs that would still share outputs fail rather
+than overwrite each other, and nothing under the output directory is read as
+input. Reruns skip
+inputs whose outputs are up to date (same input size/mtime, salary and parser
+version), so an interrupted run resumes where it stopped.
+
+Salaries come from ``--salary`` and/or a ``--salaries`` mapping: a JSON object
+or a two-column CSV (file, salary) keyed by relative path, file name or stem.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .columnar import COLUMNAR_EXTENSIONS
+from .parsers import PARSER_VERSION
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.pdf', '.txt') + COLUMNAR_EXTENSIONS
+
+
+def _glob_root(pattern):
+    """Leading directories of a glob pattern, up to the first one with a wildcard"""
+    root = os.path.dirname(pattern)
+    while root and glob.escape(root) != root:
+        root = os.path.dirname(root)
+    return root or os.curdir
+
+
+def _is_inside(path, directory):
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def find_inputs(patterns, exclude=None):
+    """Resolve directories and glob patterns to (path, name relative to its root) pairs
+
+    Files under ``exclude`` (the output directory) are left out.
+    """
+    exclude = os.path.abspath(exclude) if exclude else None
+    found = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                if exclude:
+                    dirs[:] = [d for d in dirs if not _is_inside(os.path.abspath(os.path.join(root, d)), exclude)]
+                for file_name in files:
+                    path = os.path.join(root, file_name)
+                    found.setdefault(os.path.abspath(path), os.path.relpath(path, pattern))
+        else:
+            root = _glob_root(pattern)
+            for path in glob.glob(pattern, recursive=True):
+                if os.path.isfile(path):
+                    found.setdefault(os.path.abspath(path), os.path.relpath(path, root))
+    return sorted(
+        (path, relative) for path, relative in found.items()
+        if relative.lower().endswith(SUPPORTED_EXTENSIONS) and not (exclude and _is_inside(path, exclude))
+    )
+
+
+def load_salaries(path):
+    """Read a salary mapping from a JSON object or a (file, salary) CSV"""
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return {str(k): float(v) for k, v in json.load(f).items()}
+    salaries = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[0].strip():
+                continue
+            try:
+                salaries[row[0].strip()] = float(row[1])
+            except ValueError:
+                continue  # header row
+    return salaries
+
+
+def salary_for(relative, salaries, default):
+    for key in (relative, os.path.basename(relative), os.path.splitext(os.path.basename(relative))[0]):
+        if key in salaries:
+            return salaries[key]
+    return default
+
+
+def output_paths(output_dir, relative):
+    # The extension stays in the name, so stmt.csv and stmt.txt get separate outputs
+    base = os.path.join(output_dir, relative)
+    return {
+        "report": f"{base}.report.txt",
+        "data": f"{base}.normalized.csv",
+        "meta": f"{base}.meta.json",
+    }
+
+
+def _input_fingerprint(path, salary):
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "salary": salary,
+        "parser_version": PARSER_VERSION,
+    }
+
+
+def is_up_to_date(path, outputs, salary):
+    """True when every output exists and the meta file matches the current input"""
+    if not all(os.path.exists(p) for p in outputs.values()):
+        return False
+    try:
+        with open(outputs["meta"], encoding='utf-8') as f:
+            return json.load(f) == _input_fingerprint(path, salary)
+    except (OSError, ValueError):
+        return False
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def process_file(path, relative, outputs, salary):
+    """Parse one statement and write its report and normalized data; returns row count"""
+    from .exports import build_csv
+    from .ingest import load_columnar, load_text, load_upload
+    from .report import generate_financial_report
+
+    name = relative.lower()
+    if name.endswith(COLUMNAR_EXTENSIONS):
+        # Mapped rather than read, so Arrow inputs reach the store without a copy
+        store, _ = load_columnar(path)
+    else:
+        with open(path, 'rb') as f:
+            content = f.read()
+        if name.endswith('.txt'):
+            store, _ = load_text(content.decode('utf-8', errors='replace'))
+        else:
+            # One process per file already fills the pool, so PDFs parse serially here
+            store, _ = load_upload(content, relative, pdf_workers=1)
+
+    os.makedirs(os.path.dirname(outputs["report"]), exist_ok=True)
+    report = generate_financial_report(store.summary(salary))
+    _write_atomic(outputs["report"], report.encode('utf-8'))
+    _write_atomic(outputs["data"], build_csv(store))
+    # Written last: its presence marks the outputs as complete
+    _write_atomic(outputs["meta"], json.dumps(_input_fingerprint(path, salary)).encode('utf-8'))
+    return len(store)
+
+
+def _run_task(task):
+    path, relative, outputs, salary = task
+    start = time.perf_counter()
+    try:
+        rows = process_file(path, relative, outputs, salary)
+        return relative, rows, time.perf_counter() - start, None
+    except Exception as e:
+        return relative, 0, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def run_batch(patterns, output_dir, default_salary=None, salaries=None, workers=None, force=False, log=None):
+    """Process every input and return counts of processed, skipped and failed files"""
+    log = log or (lambda message: print(message, file=sys.stderr, flush=True))
+    salaries = salaries or {}
+    inputs = find_inputs(patterns, exclude=output_dir)
+
+    # Inputs from different roots can have the same relative name, and so the same outputs
+    sources = {}
+    for path, relative in inputs:
+        sources.setdefault(os.path.normpath(relative), []).append(path)
+
+    tasks = []
+    counts = {"processed": 0, "skipped": 0, "failed": 0}
+    for path, relative in inputs:
+        same_name = sources[os.path.normpath(relative)]
+        if len(same_name) > 1:
+            others = ", ".join(other for other in same_name if other != path)
+            log(f"FAIL {relative}: {path} would write the same outputs as {others}; pass their common parent directory instead")
+            counts["failed"] += 1
+            continue
+        salary = salary_for(relative, salaries, default_salary)
+        if salary is None:
+            log(f"FAIL {relative}: no salary given (use --salary or --salaries)")
+            counts["failed"] += 1
+            continue
+        outputs = output_paths(output_dir, relative)
+        if not force and is_up_to_date(path, outputs, salary):
+            counts["skipped"] += 1
+            continue
+        tasks.append((path, relative, outputs, salary))
+
+    log(f"{len(inputs)} inputs: {len(tasks)} to process, {counts['skipped']} up to date")
+    if not tasks:
+        return counts
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_task, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            relative, rows, seconds, error = future.result()
+            if error:
+                counts["failed"] += 1
+                log(f"[{done}/{len(tasks)}] FAIL {relative}: {error}")
+            else:
+                counts["processed"] += 1
+                log(f"[{done}/{len(tasks)}] ok {relative} ({rows:,} rows, {seconds:.2f}s)")
+
+    elapsed = time.perf_counter() - start
+    log(f"done in {elapsed:.1f}s: {counts['processed']} processed, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m finance_engine.batch",
+        description="Generate financial reports for directories of statement files."
+    )
+    parser.add_argument("inputs", nargs="+", help="directories or glob patterns of CSV/XLSX/PDF/TXT/Parquet/Arrow files")
+    parser.add_argument("-o", "--output-dir", required=True, help="where reports and normalized data are written")
+    parser.add_argument("--salary", type=float, help="monthly salary for inputs missing from --salaries")
+    parser.add_argument("--salaries", help="JSON or CSV mapping of file (path, name or stem) to salary")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="reprocess inputs even if outputs are up to date")
+    args = parser.parse_args(argv)
+
+    salaries = load_salaries(args.salaries) if args.salaries else {}
+    counts = run_batch(args.inputs, args.output_dir, args.salary, salaries, args.workers, args.force)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Dashboard figures built from a FinancialSummary.
+
+The spending pie shows the largest categories and folds the long tail of a
+raw statement (thousands of merchants) into one "Other" slice, so the figure
+sent to the browser stays small whatever the data. Figures are cached
+process-wide by chart, data version, salary, period and theme, so reruns and
+sessions looking at the same data reuse one figure instead of rebuilding it.
+Cached figures are shared: callers must not modify them.
+
+Plotly is imported by the builders, off the app's startup path.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from .tracing import traced
+
+# Pie slices shown; smaller categories are summed into one Other slice
+CHART_TOP_CATEGORIES = int(os.environ.get("FINANCE_BUDDY_CHART_CATEGORIES", "10"))
+
+# Figures kept before the least recently used is dropped
+CHART_CACHE_ENTRIES = int(os.environ.get("FINANCE_BUDDY_CHART_CACHE_ENTRIES", "256"))
+
+OTHER_LABEL = "Other"
+
+PIE_COLORS = ['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4', '#feca57', '#ff9ff3', '#54a0ff']
+OTHER_COLOR = '#8395a7'
+
+# Font colour for each Streamlit theme the figures are drawn on
+THEMES = {
+    "dark": "white",
+    "light": "#1f2937",
+}
+DEFAULT_THEME = "dark"
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def top_slices(summary, limit=None):
+    """(labels, values) of the largest categories, the rest summed into a final Other slice"""
+    limit = limit or CHART_TOP_CATEGORIES
+    ranked = summary.sorted_categories()
+    shown, rest = ranked[:limit], ranked[limit:]
+    labels = [name for name, _ in shown]
+    values = [amount for _, amount in shown]
+    if rest:
+        labels.append(f"{OTHER_LABEL} ({len(rest)})")
+        values.append(sum(amount for _, amount in rest))
+    return labels, values
+
+
+@traced("create_premium_pie_chart")
+def create_premium_pie_chart(summary, theme=DEFAULT_THEME):
+    """Create premium spending breakdown pie chart"""
+    import plotly.graph_objects as go
+
+    if not summary.transaction_count:
+        return go.Figure()
+
+    labels, values = top_slices(summary)
+    colors = [PIE_COLORS[i % len(PIE_COLORS)] for i in range(len(labels))]
+    if len(summary.categories) > CHART_TOP_CATEGORIES:
+        colors[-1] = OTHER_COLOR
+
+    fig = go.Figure(go.Pie(
+        labels=labels,
+        values=values,
+        marker=dict(colors=colors),
+        sort=False,
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Amount: ₹%{value:,.0f}<br>Percentage: %{percent}<extra></extra>'
+    ))
+    fig.update_layout(
+        title="💰 Monthly Spending Breakdown" if summary.months == 1 else f"💰 Spending Breakdown, {summary.period}",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=THEMES.get(theme, THEMES[DEFAULT_THEME]), size=12, family="Poppins"),
+        title_font_size=16
+    )
+    return fig
+
+
+@traced("create_savings_chart")
+def create_savings_chart(summary, theme=DEFAULT_THEME):
+    """Create premium savings vs spending chart"""
+    import plotly.graph_objects as go
+
+    if not summary.transaction_count or summary.salary == 0:
+        return go.Figure()
+
+    salary = summary.salary
+    total_spending = summary.total_spending
+    savings = summary.savings
+    budget = 'Monthly Budget' if summary.months == 1 else f'{summary.months}-Month Budget'
+
+    fig = go.Figure(data=[
+        go.Bar(
+            name='💸 Spending',
+            x=[budget],
+            y=[total_spending],
+            marker_color='#ff6b6b',
+            text=[f'₹{total_spending:,.0f}'],
+            textposition='auto'
+        ),
+        go.Bar(
+            name='💰 Savings',
+            x=[budget],
+            y=[savings],
+            marker_color='#4ecdc4',
+            text=[f'₹{savings:,.0f}'],
+            textposition='auto'
+        )
+    ])
+
+    fig.update_layout(
+        title=f"📊 {budget} Overview (₹{salary:,.0f} salary)",
+        barmode='stack',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=THEMES.get(theme, THEMES[DEFAULT_THEME]), family="Poppins"),
+        showlegend=True
+    )
+    return fig
+
+
+CHART_BUILDERS = {
+    "pie": create_premium_pie_chart,
+    "savings": create_savings_chart,
+}
+
+
+def get_chart(kind, summary, theme=DEFAULT_THEME):
+    """Figure for a summary, built once per chart, data version, salary, period and theme"""
+    key = (kind, summary.version, summary.salary, summary.period, theme)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    fig = CHART_BUILDERS[kind](summary, theme)
+
+    with _cache_lock:
+        fig = _cache.setdefault(key, fig)
+        while len(_cache) > CHART_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return fig
@@ -0,0 +1,244 @@
+"""Merchant-to-category classification for raw statement descriptions.
+
+Bank narrations ("UPI/401234567890/SWIGGY/swiggy@icici", "POS 4321 DMART
+ANDHERI") name thousands of distinct merchants. ``MerchantClassifier`` maps
+each description onto a bounded set of categories by scanning it for known
+merchant and keyword names. The keywords are compiled into a trie, emitted as
+one regular expression with shared prefixes factored out, so a lookup is a
+single ``search`` by the C regex engine whatever the size of the dictionary.
+Specific merchants and generic words like "UPI" or "charges" live in separate
+patterns, and a generic word only decides when no merchant is named.
+
+Results are memoized by description, since typed entries and recurring
+merchants repeat across lines and statements. Statement narrations with no
+known keyword become ``OTHER``, so the category set stays bounded however many
+merchants a statement names. Only entries the user typed (``typed=True``) keep
+their own text when it reads like a category ("Pet Care", "Diwali Gifts").
+
+Extra keywords can be supplied as a JSON object of ``{category: [keyword,
+...]}`` in the file named by ``FINANCE_BUDDY_MERCHANTS``.
+"""
+import json
+import os
+import re
+import threading
+
+# JSON file of {category: [keyword, ...]} merged into the built-in dictionary
+MERCHANTS_FILE = os.environ.get("FINANCE_BUDDY_MERCHANTS") or None
+
+# Descriptions memoized before the memo is reset
+CLASSIFIER_CACHE_SIZE = int(os.environ.get("FINANCE_BUDDY_CLASSIFIER_CACHE", "100000"))
+
+OTHER = "Other"
+
+# Category -> keywords of lower-case ASCII words. A space in a keyword matches
+# any run of punctuation or spaces. Keywords match at the start of a word (so
+# "swiggy" finds "swiggyinstamart"); ones of three letters or fewer must also
+# end one. Words that are also common in other names are only listed qualified
+# ("apollo pharmacy", not "apollo", which would catch Apollo Tyres; "internet
+# bill", not "internet", which would catch internet banking charges).
+MERCHANT_KEYWORDS = {
+    "Rent": [
+        "rent", "house rent", "room rent", "pg rent", "nobroker", "nestaway", "society maintenance",
+    ],
+    "Groceries": [
+        "groceries", "grocery", "bigbasket", "big basket", "bbnow", "blinkit", "grofers", "zepto",
+        "instamart", "swiggy instamart", "swiggyinstamart", "dmart", "d mart", "avenue supermarts",
+        "reliance fresh", "reliance smart", "jiomart", "more retail", "spencers", "natures basket", "nature s basket", "kirana", "supermarket",
+        "vegetables", "milk", "dairy", "licious", "freshtohome", "country delight", "milkbasket",
+    ],
+    "Food & Dining": [
+        "food", "dining", "dining out", "restaurant", "swiggy", "zomato", "dominos", "domino s",
+        "pizza hut", "mcdonalds", "mcdonald s", "kfc", "burger king", "subway", "starbucks",
+        "cafe coffee day", "ccd", "chaayos", "haldiram", "barbeque nation", "eatsure", "faasos",
+        "box8", "cafe", "bakery", "eatclub", "dunkin", "baskin robbins", "behrouz",
+    ],
+    "Transport": [
+        "transport", "uber", "ola", "olacabs", "ola cabs", "rapido", "metro card", "metro rail", "metro ticket",
+        "dmrc", "bmrcl", "bmtc", "best bus", "namma yatri", "blusmart", "cab", "taxi", "auto rickshaw", "fastag",
+        "fastag toll", "toll plaza", "toll tax", "parking",
+    ],
+    "Fuel": [
+        "fuel", "petrol", "diesel", "indian oil", "iocl", "hpcl", "bpcl", "bharat petroleum",
+        "hindustan petroleum", "nayara", "shell", "cng",
+    ],
+    "Utilities": [
+        "utilities", "utility", "electricity", "electricity bill", "bescom", "msedcl", "tata power",
+        "adani electricity", "bses", "torrent power", "tneb", "water bill", "gas bill", "indane",
+        "hp gas", "bharat gas", "mahanagar gas", "igl", "broadband", "internet bill", "internet broadband", "internet service", "act fibernet",
+        "hathway", "jiofiber",
+    ],
+    "Bills & Recharges": [
+        "recharge", "mobile recharge", "airtel", "jio", "vodafone", "bsnl", "postpaid", "prepaid",
+        "dth", "tata play", "tata sky", "dish tv", "bill payment", "bbps",
+    ],
+    "Shopping": [
+        "shopping", "amazon", "flipkart", "myntra", "ajio", "meesho", "nykaa", "tata cliq", "snapdeal",
+        "decathlon", "ikea", "croma", "reliance digital", "lifestyle", "shoppers stop", "pantaloons",
+        "westside", "zara", "uniqlo", "lenskart", "firstcry", "pepperfry", "urban ladder", "clothes",
+        "clothing", "electronics",
+    ],
+    "Entertainment": [
+        "entertainment", "netflix", "amazon prime", "prime video", "hotstar", "disney", "jiocinema",
+        "sonyliv", "zee5", "spotify", "gaana", "youtube premium", "bookmyshow", "pvr", "inox",
+        "cinepolis", "movie", "movies", "steam games", "steampowered", "steam store", "playstation",
+    ],
+    "Health": [
+        "health", "medical", "medicine", "medicines", "pharmacy", "apollo pharmacy", "apollo hospital",
+        "apollo clinic", "apollo 24 7", "medplus", "pharmeasy",
+        "netmeds", "1mg", "tata 1mg", "practo", "hospital", "clinic", "diagnostic", "lal pathlabs",
+        "thyrocare", "doctor", "cult fit", "cultfit", "gym", "fitness",
+    ],
+    "Education": [
+        "education", "school", "school fees", "college", "tuition", "byju", "byjus", "unacademy",
+        "udemy", "coursera", "vedantu", "upgrad", "books",
+    ],
+    "Travel": [
+        "travel", "irctc", "makemytrip", "goibibo", "cleartrip", "yatra", "ixigo", "easemytrip",
+        "indigo", "air india", "vistara", "spicejet", "akasa", "redbus", "oyo", "airbnb", "hotel",
+        "booking com", "agoda", "flight", "airline", "airlines", "airways",
+    ],
+    "Insurance": [
+        "insurance", "lic", "lic of india", "policybazaar", "hdfc ergo", "icici lombard", "star health",
+        "max life", "sbi life", "acko", "digit insurance",
+    ],
+    "Investments": [
+        "investment", "investments", "sip", "mutual fund", "zerodha", "groww", "upstox", "kuvera",
+        "paytm money", "ppf", "nps", "smallcase", "indmoney", "angel one", "etmoney", "stocks",
+    ],
+    "EMI & Loans": [
+        "emi", "loan emi", "loan repayment", "loan instalment", "loan installment", "home loan", "car loan",
+        "personal loan", "education loan", "bajaj finserv", "bajaj finance",
+    ],
+    "Cash Withdrawal": [
+        "atm", "atw", "nwd", "cash withdrawal",
+    ],
+    "Fees & Charges": [
+        "charges", "charge", "fee", "fees", "gst", "penalty", "late fee", "annual fee", "sms charges",
+    ],
+    "Transfers": [
+        "upi", "neft", "imps", "rtgs", "transfer", "fund transfer", "self transfer", "paytm", "phonepe",
+        "gpay", "google pay", "bhim", "credit card payment", "cc payment",
+    ],
+}
+
+# Categories whose keywords only decide when nothing more specific matched
+GENERIC_CATEGORIES = ("Transfers", "Fees & Charges")
+
+# Unmatched typed entries shaped like this are kept as their own category
+_LABEL = re.compile(r"[A-Za-z][A-Za-z&'.-]*(?: [A-Za-z&'.-]+){0,2}")
+_LABEL_MAX_CHARS = 24
+
+_WORDS = re.compile(r"[a-z0-9]+")
+_WORD_START = r"(?<![a-z0-9])"
+_WORD_END = r"(?![a-z0-9])"
+_SEPARATOR = r"[^a-z0-9]+"
+_SHORT_KEYWORD = 3
+
+_default_classifier = None
+_default_lock = threading.Lock()
+
+
+def _keyword(text):
+    """Keyword as its lower-case words joined by single spaces"""
+    return " ".join(_WORDS.findall(str(text).lower()))
+
+
+def _trie_pattern(keywords):
+    """Compiled regex matching any keyword, longest first at each position, as a factored trie"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        tokens = [_SEPARATOR if char == " " else re.escape(char) for char in keyword]
+        if len(keyword) <= _SHORT_KEYWORD:
+            tokens.append(_WORD_END)
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[""] = {}
+
+    def emit(node):
+        terminal = "" in node
+        branches = [token + emit(child) for token, child in sorted(node.items()) if token]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        # Optional continuation: the greedy ? tries the longer keyword first
+        body = f"(?:{'|'.join(branches)})"
+        return f"{body}?" if terminal else body
+
+    # A pattern that never matches when there are no keywords
+    return re.compile(_WORD_START + emit(trie) if trie else r"(?!)")
+
+
+class MerchantClassifier:
+    """Keyword dictionary compiled into multi-pattern matchers, with memoized lookups"""
+
+    def __init__(self, keywords=None, cache_size=CLASSIFIER_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._categories = {}
+        specific, generic = [], []
+        for category, words in (keywords or MERCHANT_KEYWORDS).items():
+            for word in map(_keyword, words):
+                if word:
+                    self._categories[word] = category
+                    (generic if category in GENERIC_CATEGORIES else specific).append(word)
+        self.categories = sorted(set(self._categories.values()))
+        self._specific = _trie_pattern(specific)
+        self._generic = _trie_pattern(generic)
+        self._memo = {}
+
+    def match(self, description):
+        """Category of the first merchant (else generic) keyword in the description, or None"""
+        text = str(description).lower()
+        found = self._specific.search(text) or self._generic.search(text)
+        return self._categories[_keyword(found.group())] if found else None
+
+    def classify(self, description, typed=False):
+        """Category for one description; unmatched ones are OTHER, or their own text if typed"""
+        # "" memoizes a description no keyword matched
+        category = self._memo.get(description)
+        if category is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            category = self.match(description) or ""
+            if len(self._memo) >= self.cache_size:
+                # Bounded by starting over; statements reuse a small working set of descriptions
+                self._memo.clear()
+            self._memo[description] = category
+        if category:
+            return category
+        if typed:
+            text = str(description).strip()
+            if len(text) <= _LABEL_MAX_CHARS and _LABEL.fullmatch(text):
+                return text
+        return OTHER
+
+    def classify_many(self, descriptions, typed=False):
+        """Categories for a sequence of descriptions"""
+        return [self.classify(description, typed) for description in descriptions]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "memoized": len(self._memo)}
+
+
+def _load_keywords(path):
+    """Built-in keywords merged with a {category: [keyword, ...]} JSON file"""
+    keywords = {category: list(words) for category, words in MERCHANT_KEYWORDS.items()}
+    with open(path, encoding="utf-8") as f:
+        for category, words in json.load(f).items():
+            keywords.setdefault(str(category), []).extend(str(word) for word in words)
+    return keywords
+
+
+def get_classifier():
+    """Process-wide classifier built from the built-in and configured keywords"""
+    global _default_classifier
+    with _default_lock:
+        if _default_classifier is None:
+            keywords = _load_keywords(MERCHANTS_FILE) if MERCHANTS_FILE else MERCHANT_KEYWORDS
+            _default_classifier = MerchantClassifier(keywords)
+        return _default_classifier
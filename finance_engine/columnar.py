@@ -0,0 +1,136 @@
+"""Parquet and Arrow IPC conversion of a TransactionStore.
+
+Both formats carry the store's own columns: ``date`` (date32), ``category``
+(dictionary-encoded string) and ``amount`` (float64). Arrow IPC files are
+written uncompressed as a single record batch, so reading one back maps the
+file (or wraps the uploaded bytes) and hands the amount and category-code
+buffers to the store without copying or parsing; only the dates are widened
+from 32 to 64 bits. Parquet is compressed and smaller, and decodes straight to
+the same columns.
+
+Tables with other column names or types (Parquet/Arrow files produced by
+other tools) are converted to a frame and normalized like any CSV upload.
+"""
+from .store import TransactionStore
+from .tracing import traced
+
+COLUMNS = ("date", "category", "amount")
+
+# Compression for Parquet exports; Arrow IPC stays uncompressed so it can be mapped
+PARQUET_COMPRESSION = "zstd"
+
+# File extensions read by read_table / load_columnar
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc", ".arrows")
+COLUMNAR_EXTENSIONS = PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+_PARQUET_MAGIC = b"PAR1"
+_ARROW_FILE_MAGIC = b"ARROW1"
+
+
+def table_from_store(store):
+    """pyarrow Table (date32 date, dictionary category, float64 amount) sharing the store's columns"""
+    import pyarrow as pa
+
+    return pa.table({
+        "date": pa.array(store.dates, type=pa.date32()),
+        "category": pa.DictionaryArray.from_arrays(
+            pa.array(store.category_codes, type=pa.int32()), pa.array(store.categories, type=pa.string())
+        ),
+        "amount": pa.array(store.amounts, type=pa.float64()),
+    })
+
+
+def is_store_table(table):
+    """True when the table has the store's columns with types store_from_table reads directly"""
+    import pyarrow as pa
+
+    names = table.schema.names
+    if not all(name in names for name in COLUMNS):
+        return False
+    date_type = table.schema.field("date").type
+    category_type = table.schema.field("category").type
+    if pa.types.is_dictionary(category_type):
+        category_type = category_type.value_type
+    return (
+        (pa.types.is_date(date_type) or pa.types.is_timestamp(date_type))
+        and (pa.types.is_string(category_type) or pa.types.is_large_string(category_type))
+        and (pa.types.is_floating(table.schema.field("amount").type)
+             or pa.types.is_integer(table.schema.field("amount").type))
+        and not any(table.column(name).null_count for name in COLUMNS)
+    )
+
+
+def _single_array(column):
+    # One-chunk columns (every file we write) are used as-is; others are concatenated
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def store_from_table(table):
+    """TransactionStore from a date/category/amount Table, reusing its buffers where possible"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if not table.num_rows:
+        return TransactionStore.empty()
+    if not pa.types.is_dictionary(table.schema.field("category").type):
+        table = table.set_column(
+            table.schema.get_field_index("category"), "category", pc.dictionary_encode(table.column("category"))
+        )
+    if table.column("category").num_chunks > 1:
+        table = table.unify_dictionaries()
+    category = _single_array(table.column("category"))
+    amounts = _single_array(table.column("amount"))
+    if not pa.types.is_float64(amounts.type):
+        amounts = amounts.cast(pa.float64())
+    dates = _single_array(table.column("date"))
+    if not pa.types.is_date32(dates.type):
+        dates = dates.cast(pa.date32())
+    return TransactionStore.from_columns(
+        amounts.to_numpy(),
+        category.indices.to_numpy(zero_copy_only=False),
+        category.dictionary.to_pylist(),
+        dates.to_numpy(zero_copy_only=False)
+    )
+
+
+@traced("build_parquet")
+def build_parquet(store):
+    """Parquet bytes of the store's columns"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(table_from_store(store), sink, compression=PARQUET_COMPRESSION)
+    return sink.getvalue().to_pybytes()
+
+
+@traced("build_arrow")
+def build_arrow(store):
+    """Uncompressed Arrow IPC file bytes of the store's columns, in one record batch"""
+    import pyarrow as pa
+
+    table = table_from_store(store)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@traced("read_table", rows=lambda table: table.num_rows)
+def read_table(source):
+    """pyarrow Table from Parquet or Arrow IPC bytes, or a file path (memory-mapped)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = pa.BufferReader(pa.py_buffer(source))
+    else:
+        source = pa.memory_map(source)
+    magic = source.read(len(_ARROW_FILE_MAGIC))
+    source.seek(0)
+    if magic.startswith(_PARQUET_MAGIC):
+        return pq.read_table(source)
+    if magic == _ARROW_FILE_MAGIC:
+        return pa.ipc.open_file(source).read_all()
+    return pa.ipc.open_stream(source).read_all()
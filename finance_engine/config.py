@@ -0,0 +1,35 @@
+"""Explicit engine settings for LLM-backed features"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from .llm_client import GROQ_API_BASE
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """API credentials and model parameters passed to the insight functions"""
+    api_key: Optional[str] = None
+    api_base: str = GROQ_API_BASE
+    model: str = "llama-3.1-8b-instant"
+    max_tokens: int = 1000
+    temperature: float = 0.7
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Config from GROQ_API_KEY / GROQ_API_BASE, with keyword overrides"""
+        settings = {
+            "api_key": os.environ.get("GROQ_API_KEY") or None,
+            "api_base": GROQ_API_BASE,
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    @property
+    def model_params(self):
+        """Request parameters sent with every completion (and part of the cache key)"""
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
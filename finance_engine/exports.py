@@ -0,0 +1,124 @@
+"""On-demand CSV, Excel, Parquet and Arrow exports of a TransactionStore.
+
+Exports are only built when a download is requested and are cached against the
+store's content version, so reruns and repeated downloads of unchanged data
+reuse the same bytes. Excel files are written with openpyxl's write-only
+workbook in fixed-size row batches, keeping memory flat regardless of size.
+Parquet and Arrow IPC files are written from the store's columns by
+``columnar``.
+"""
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+
+from .columnar import build_arrow, build_parquet
+from .tracing import traced
+
+EXPORT_CACHE_MAX_MB = int(os.environ.get("FINANCE_BUDDY_EXPORT_CACHE_MB", "128"))
+
+# Rows expanded from the columnar store at a time while writing
+_EXPORT_BATCH_ROWS = 50_000
+
+# Excel's sheet limit minus the header row; larger exports continue on new sheets
+_EXCEL_MAX_DATA_ROWS = 1_048_575
+
+COLUMNS = ["category", "amount", "date"]
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _iter_row_batches(store):
+    """Yield (categories, amounts, dates) lists covering the store in order"""
+    names = np.asarray(store.categories, dtype=object)
+    for start in range(0, len(store), _EXPORT_BATCH_ROWS):
+        stop = start + _EXPORT_BATCH_ROWS
+        yield (
+            names[store.category_codes[start:stop]].tolist(),
+            store.amounts[start:stop].tolist(),
+            np.datetime_as_string(store.dates[start:stop], unit='D').tolist()
+        )
+
+
+@traced("build_csv")
+def build_csv(store):
+    """CSV bytes with the same columns and layout as DataFrame.to_csv(index=False)"""
+    buffer = BytesIO()
+    buffer.write((",".join(COLUMNS) + "\n").encode("utf-8"))
+    for start in range(0, len(store), _EXPORT_BATCH_ROWS):
+        store.to_frame(start, start + _EXPORT_BATCH_ROWS).to_csv(buffer, index=False, header=False)
+    return buffer.getvalue()
+
+
+@traced("build_excel")
+def build_excel(store):
+    """XLSX bytes written row-streamed through a write-only openpyxl workbook"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = _EXCEL_MAX_DATA_ROWS
+    bold = Font(bold=True)
+
+    def new_sheet():
+        title = "Sheet1" if not workbook.worksheets else f"Sheet{len(workbook.worksheets) + 1}"
+        ws = workbook.create_sheet(title)
+        header = []
+        for name in COLUMNS:
+            cell = WriteOnlyCell(ws, value=name)
+            cell.font = bold
+            header.append(cell)
+        ws.append(header)
+        return ws
+
+    for categories, amounts, dates in _iter_row_batches(store):
+        for row in zip(categories, amounts, dates):
+            if sheet_rows >= _EXCEL_MAX_DATA_ROWS:
+                sheet = new_sheet()
+                sheet_rows = 0
+            sheet.append(row)
+            sheet_rows += 1
+    if sheet is None:
+        new_sheet()
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+EXPORT_BUILDERS = {
+    "csv": build_csv,
+    "xlsx": build_excel,
+    "parquet": build_parquet,
+    "arrow": build_arrow,
+}
+
+
+def get_export(store, fmt):
+    """Export bytes for the store in fmt, built once per data version"""
+    global _cache_bytes
+    key = (store.version, fmt)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    data = EXPORT_BUILDERS[fmt](store)
+
+    limit = EXPORT_CACHE_MAX_MB * 1024 * 1024
+    if len(data) <= limit:
+        with _cache_lock:
+            if key not in _cache:
+                _cache[key] = data
+                _cache_bytes += len(data)
+            while _cache_bytes > limit:
+                _, evicted = _cache.popitem(last=False)
+                _cache_bytes -= len(evicted)
+    return data
@@ -0,0 +1,202 @@
+"""Normalization and bounded-memory ingestion of uploaded statements.
+
+``normalize_frame`` maps a raw Category/Amount/Date frame onto the unified
+category/amount/date columns. ``read_statement_chunked`` applies it to a CSV
+or Excel upload one chunk at a time, folding each chunk into a
+``TransactionStoreBuilder`` so the raw rows never have to be held at once.
+Parquet and Arrow IPC files skip text parsing: ``load_columnar`` reads the
+table with pyarrow and, when it has the store's own columns, builds the store
+directly from its buffers.
+"""
+import os
+from datetime import date
+from io import BytesIO
+
+import pandas as pd
+
+from .columnar import COLUMNAR_EXTENSIONS, is_store_table, read_table, store_from_table
+from .parsers import _DATE_ONLY, _match_date, parse_pdf, parse_text_input
+from .store import UNKNOWN_CATEGORY, TransactionStore, TransactionStoreBuilder
+from .tracing import traced
+
+# Uploads above this size are ingested chunk by chunk instead of in one read
+STREAMING_THRESHOLD_BYTES = 5 * 1024 * 1024
+
+# Working-memory budget for one raw chunk plus its normalized copy
+INGEST_MEMORY_LIMIT_MB = int(os.environ.get("FINANCE_BUDDY_INGEST_MEMORY_MB", "64"))
+
+# Rough per-row cost of a raw chunk, its string columns and the normalized frame
+_WORKING_BYTES_PER_ROW = 512
+_MIN_CHUNK_ROWS = 1000
+_PREVIEW_ROWS = 5
+
+
+def _column(df, name):
+    """The raw statement column `name`, or the lower-case one our own exports write"""
+    for key in (name, name.lower()):
+        if key in df.columns:
+            return df[key]
+    return None
+
+
+@traced("normalize_frame", rows=len)
+def normalize_frame(df):
+    """Normalize a raw DataFrame into category/amount/date columns using whole-column operations"""
+    today = date.today().strftime('%Y-%m-%d')
+    categories = _column(df, 'Category')
+    if categories is not None:
+        # Blank cells stay NaN through astype(str) on pandas 3
+        categories = categories.fillna(UNKNOWN_CATEGORY).astype(str)
+    else:
+        categories = pd.Series(UNKNOWN_CATEGORY, index=df.index)
+
+    amounts = _column(df, 'Amount')
+    if amounts is not None:
+        amounts = amounts.astype(float)
+    else:
+        amounts = pd.Series(0.0, index=df.index)
+
+    dates = _column(df, 'Date')
+    if dates is not None:
+        dates = _normalize_dates(dates, today)
+    else:
+        dates = pd.Series(today, index=df.index)
+
+    return pd.DataFrame({
+        "category": categories.to_numpy(),
+        "amount": amounts.to_numpy(),
+        "date": dates.to_numpy()
+    })
+
+
+def _normalize_dates(column, default):
+    """Parse a date column to YYYY-MM-DD strings, filling unparseable values with the default"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        parsed = column
+    else:
+        # Statements repeat the same few dates, so parse each distinct value once
+        codes, uniques = pd.factorize(column.astype(str), use_na_sentinel=False)
+        parsed_uniques = pd.to_datetime(pd.Series([_parse_date(value) for value in uniques]), errors='coerce')
+        parsed = pd.Series(parsed_uniques.to_numpy()[codes], index=column.index)
+    return parsed.dt.strftime('%Y-%m-%d').fillna(default)
+
+
+def _parse_date(text):
+    """Date for one raw value, or None; numeric dates are day first, as in the line parser"""
+    if not isinstance(text, str):
+        return None
+    text = text.strip()
+    match = _DATE_ONLY.match(text)
+    if match:
+        # 05/03/2024 is 5 March and 03/13/2024 is not a date; a trailing time is ignored
+        return _match_date(match)
+    # Other shapes ("March 5, 2024", 2024/03/05) are left to pandas
+    parsed = pd.to_datetime(text, errors='coerce')
+    return None if pd.isna(parsed) else parsed
+
+
+def normalize_data(df):
+    """Convert DataFrame to unified JSON format"""
+    if df.empty:
+        return []
+    return normalize_frame(df).to_dict('records')
+
+
+def chunk_rows_for(memory_limit_mb):
+    """Number of raw rows per chunk that keeps the working set under memory_limit_mb"""
+    return max(_MIN_CHUNK_ROWS, int(memory_limit_mb * 1024 * 1024) // _WORKING_BYTES_PER_ROW)
+
+
+@traced("read_statement_chunked", rows=lambda result: len(result[0]))
+def read_statement_chunked(file, file_name, memory_limit_mb=INGEST_MEMORY_LIMIT_MB):
+    """Stream a CSV/Excel statement into a TransactionStore without loading it whole.
+
+    Returns ``(store, preview)`` where preview holds the first few raw rows.
+    Peak working memory is bounded by ``memory_limit_mb`` regardless of file
+    size; only the compact store (about 20 bytes per row) grows with the input.
+    """
+    chunk_rows = chunk_rows_for(memory_limit_mb)
+    name = file_name.lower()
+    if name.endswith('.csv'):
+        chunks = pd.read_csv(file, chunksize=chunk_rows)
+    elif name.endswith('.xlsx'):
+        chunks = _iter_excel_chunks(file, chunk_rows)
+    else:
+        # Legacy .xls has no row-streaming reader, so it is read in one go
+        chunks = [pd.read_excel(file)]
+
+    builder = TransactionStoreBuilder()
+    preview = None
+    for chunk in chunks:
+        if preview is None:
+            preview = chunk.head(_PREVIEW_ROWS).copy()
+        if not chunk.empty:
+            builder.append_frame(normalize_frame(chunk))
+    if preview is None:
+        preview = pd.DataFrame()
+    return builder.build(), preview
+
+
+def _iter_excel_chunks(file, chunk_rows):
+    """Yield DataFrames of chunk_rows rows from the first sheet using openpyxl read-only mode"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        width = len(columns)
+        batch = []
+        for row in rows:
+            if len(row) != width:
+                row = tuple(row[:width]) + (None,) * (width - len(row))
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def store_from_raw(df):
+    """Normalize a whole raw frame into ``(store, preview)``"""
+    if df.empty:
+        return TransactionStore.empty(), df
+    return TransactionStore.from_frame(normalize_frame(df)), df.head(_PREVIEW_ROWS)
+
+
+@traced("load_text", rows=lambda result: len(result[0]))
+def load_text(text):
+    """Parse pasted statement text into ``(store, preview)``"""
+    return store_from_raw(parse_text_input(text))
+
+
+@traced("load_columnar", rows=lambda result: len(result[0]))
+def load_columnar(source):
+    """Load Parquet or Arrow IPC bytes, or a file path (memory-mapped), into ``(store, preview)``"""
+    table = read_table(source)
+    if not is_store_table(table):
+        # Files from other tools: normalize like any other tabular upload
+        return store_from_raw(table.to_pandas())
+    return store_from_table(table), table.slice(0, _PREVIEW_ROWS).to_pandas()
+
+
+@traced("load_upload", rows=lambda result: len(result[0]))
+def load_upload(content, file_name, pdf_workers=None):
+    """Parse an uploaded CSV/Excel/PDF/Parquet/Arrow file's bytes into ``(store, preview)``"""
+    name = file_name.lower()
+    if name.endswith(COLUMNAR_EXTENSIONS):
+        return load_columnar(content)
+    if name.endswith('.pdf'):
+        return store_from_raw(parse_pdf(BytesIO(content), workers=pdf_workers))
+    if len(content) > STREAMING_THRESHOLD_BYTES:
+        # Large statements are folded into the store chunk by chunk
+        return read_statement_chunked(BytesIO(content), file_name)
+    if name.endswith('.csv'):
+        return store_from_raw(pd.read_csv(BytesIO(content)))
+    return store_from_raw(pd.read_excel(BytesIO(content)))
@@ -0,0 +1,318 @@
+"""AI financial insights: prompt construction and Groq requests.
+
+The prompt is compacted to a token budget: the largest categories are listed
+with their share of spending, the rest are summed into one Other line,
+amounts use short Indian notation (₹12.5k, ₹3.2L) and recent months are given
+as a spending trend. Each request's prompt size and the tokens and estimated
+time saved against listing every category are logged and totalled in
+``prompt_metrics()``. Identical requests made at the same time by different
+sessions share one upstream call (see ``single_flight``).
+
+Nothing here touches the UI. Failures are passed to an optional
+``report_error`` callback (logged when omitted) and replaced by a basic
+summary so callers always get displayable text.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from .llm_cache import get_response_cache
+from .llm_client import LLMError, get_llm_client
+from .single_flight import get_single_flight
+from .tracing import stage
+
+logger = logging.getLogger(__name__)
+
+# Largest estimated prompt size; the category list and trend shrink to fit
+PROMPT_TOKEN_BUDGET = int(os.environ.get("FINANCE_BUDDY_PROMPT_TOKENS", "1200"))
+
+# Categories listed by name; smaller ones are summed into an Other line
+PROMPT_TOP_CATEGORIES = int(os.environ.get("FINANCE_BUDDY_PROMPT_CATEGORIES", "15"))
+
+# Most recent months listed in the spending trend
+PROMPT_TREND_MONTHS = int(os.environ.get("FINANCE_BUDDY_PROMPT_MONTHS", "12"))
+
+# Upstream prompt-processing time per 1,000 tokens, for the time-saved estimate
+PROMPT_SECONDS_PER_1K_TOKENS = float(os.environ.get("FINANCE_BUDDY_PROMPT_SECONDS_PER_1K", "0.05"))
+
+_CHARS_PER_TOKEN = 4
+_MIN_PROMPT_CATEGORIES = 3
+
+_prompt_totals = {"requests": 0, "tokens": 0, "tokens_saved": 0, "seconds_saved": 0.0}
+_prompt_lock = threading.Lock()
+
+_PROMPT_TEMPLATE = """You are an expert Indian financial advisor. Analyze this personal financial data:
+
+{data}
+
+Provide detailed analysis with:
+
+1. **FINANCIAL HEALTH ASSESSMENT**
+- Budget analysis and spending patterns
+- Savings rate evaluation (ideal is 20-30%)
+
+2. **INDIAN INVESTMENT RECOMMENDATIONS**
+- Suggest specific Indian stocks (Reliance, TCS, HDFC Bank, etc.)
+- SIP recommendations for mutual funds (amount based on income)
+- PPF, ELSS, and tax-saving options
+- Emergency fund suggestions (6 months expenses)
+
+3. **COST-CUTTING STRATEGIES**
+- Identify top 3 categories to reduce spending
+- Specific actionable steps to cut costs
+- Alternative cheaper options for expenses
+
+4. **ACTIONABLE FINANCIAL PLAN**
+- Monthly investment allocation
+- Short-term and long-term goals
+- Risk management strategies
+
+Keep it practical, India-specific, and actionable. Use Indian financial terms and context.
+"""
+
+NO_DATA_MESSAGE = "No data available for analysis."
+MISSING_KEY_MESSAGE = "No Groq API key configured. Add GROQ_API_KEY to .streamlit/secrets.toml or the environment to enable AI analysis."
+
+
+def estimate_tokens(text):
+    """Approximate token count of text for the chat model (about four characters per token)"""
+    return -(-len(text) // _CHARS_PER_TOKEN)
+
+
+def compact_amount(value):
+    """Rupee amount in Indian short form: ₹950, ₹12.5k, ₹3.2L, ₹1.1Cr"""
+    magnitude = abs(value)
+    sign = "-" if value < 0 else ""
+    for scale, suffix in ((1e7, "Cr"), (1e5, "L"), (1e3, "k")):
+        if magnitude >= scale:
+            return f"{sign}₹{magnitude / scale:.3g}{suffix}"
+    return f"{sign}₹{magnitude:.0f}"
+
+
+@dataclass(frozen=True)
+class InsightsPrompt:
+    """Prompt text for one request and how much the compaction saved"""
+    text: str
+    tokens: int
+    # Estimated tokens of the prompt with every category as indented JSON
+    full_tokens: int
+    categories_shown: int
+    categories_total: int
+    months_shown: int
+    build_seconds: float
+
+    @property
+    def tokens_saved(self):
+        return max(self.full_tokens - self.tokens, 0)
+
+    @property
+    def seconds_saved(self):
+        """Estimated upstream time saved by sending fewer prompt tokens"""
+        return self.tokens_saved * PROMPT_SECONDS_PER_1K_TOKENS / 1000
+
+
+def _overview(summary):
+    if summary.months == 1:
+        return (f"Monthly Salary: ₹{summary.salary:,.0f}\n"
+                f"Total Monthly Spending: ₹{summary.total_spending:,.0f}\n"
+                f"Monthly Savings: ₹{summary.savings:,.0f}")
+    return (f"Period: {summary.period} ({summary.months} months; amounts are totals for the period)\n"
+            f"Salary: ₹{summary.salary:,.0f} (₹{summary.monthly_salary:,.0f}/month)\n"
+            f"Total Spending: ₹{summary.total_spending:,.0f} (₹{summary.monthly_spending:,.0f}/month)\n"
+            f"Savings: ₹{summary.savings:,.0f} (₹{summary.monthly_savings:,.0f}/month)")
+
+
+def _share(amount, total):
+    share = amount / total * 100 if total else 0
+    return "<0.1%" if 0 < share < 0.05 else f"{share:.1f}%"
+
+
+def _breakdown(ranked, shown, total_spending):
+    """Top `shown` categories, one per line with share of spending, plus an Other line for the rest"""
+    if not ranked:
+        return ""
+    lines = ["Spending Breakdown (category: amount, share):"]
+    for name, amount in ranked[:shown]:
+        lines.append(f"{name}: {compact_amount(amount)}, {_share(amount, total_spending)}")
+    rest = ranked[shown:]
+    if rest:
+        amount = sum(amount for _, amount in rest)
+        lines.append(f"Other ({len(rest)} categories): {compact_amount(amount)}, {_share(amount, total_spending)}")
+    return "\n".join(lines)
+
+
+def _trend(month_totals, shown):
+    if shown < 2:
+        return ""
+    recent = month_totals[-shown:]
+    return "Monthly Spending: " + ", ".join(f"{month} {compact_amount(amount)}" for month, amount in recent)
+
+
+def _full_breakdown_chars(categories):
+    # Length of json.dumps(categories, indent=2) without building it
+    return 4 + sum(len(name) + len(repr(amount)) + 8 for name, amount in categories.items())
+
+
+def prepare_insights_prompt(summary, token_budget=None, top_categories=None):
+    """Advisor prompt within a token budget, with the compaction it needed.
+
+    Categories beyond the ``top_categories`` largest are folded into one Other
+    line and amounts are written in short form. When the prompt is still over
+    ``token_budget`` the category list, then the monthly trend, is halved
+    until it fits (or only the largest few categories are left).
+    """
+    start = time.perf_counter()
+    token_budget = token_budget or PROMPT_TOKEN_BUDGET
+    top_categories = top_categories or PROMPT_TOP_CATEGORIES
+    with stage("build_prompt") as span:
+        ranked = summary.sorted_categories()
+        overview = _overview(summary)
+        shown = min(top_categories, len(ranked))
+        months = min(PROMPT_TREND_MONTHS, len(summary.month_totals))
+        while True:
+            sections = [overview, f"Savings Rate: {summary.savings_rate:.1f}%",
+                        _trend(summary.month_totals, months), _breakdown(ranked, shown, summary.total_spending)]
+            text = _PROMPT_TEMPLATE.format(data="\n".join(section for section in sections if section))
+            tokens = estimate_tokens(text)
+            if tokens <= token_budget:
+                break
+            if shown > _MIN_PROMPT_CATEGORIES:
+                shown = max(shown // 2, _MIN_PROMPT_CATEGORIES)
+            elif months >= 2:
+                months //= 2
+            else:
+                break
+        span.rows = tokens
+        # The unbounded prompt: every category as indented JSON, no trend
+        full_chars = len(text) - len(sections[-1]) - len(sections[2]) + _full_breakdown_chars(summary.categories)
+    return InsightsPrompt(
+        text=text,
+        tokens=tokens,
+        full_tokens=-(-full_chars // _CHARS_PER_TOKEN),
+        categories_shown=min(shown, len(ranked)),
+        categories_total=len(ranked),
+        months_shown=months if months >= 2 else 0,
+        build_seconds=time.perf_counter() - start
+    )
+
+
+def build_insights_prompt(summary):
+    """Build the advisor prompt for a financial summary"""
+    return prepare_insights_prompt(summary).text
+
+
+def _record_prompt(prompt):
+    """Add one request's prompt size and savings to the process-wide totals and log it"""
+    with _prompt_lock:
+        _prompt_totals["requests"] += 1
+        _prompt_totals["tokens"] += prompt.tokens
+        _prompt_totals["tokens_saved"] += prompt.tokens_saved
+        _prompt_totals["seconds_saved"] += prompt.seconds_saved
+    logger.info(
+        "AI insights prompt: ~%d tokens (~%d saved, ~%.2fs), %d/%d categories, %d months, built in %.1f ms",
+        prompt.tokens, prompt.tokens_saved, prompt.seconds_saved, prompt.categories_shown,
+        prompt.categories_total, prompt.months_shown, prompt.build_seconds * 1000
+    )
+
+
+def prompt_metrics():
+    """Requests, prompt tokens sent and tokens/seconds saved by compaction, since startup"""
+    with _prompt_lock:
+        metrics = dict(_prompt_totals)
+    requests = metrics["requests"]
+    metrics["tokens_per_request"] = metrics["tokens"] / requests if requests else None
+    metrics["seconds_saved_per_request"] = metrics["seconds_saved"] / requests if requests else None
+    return metrics
+
+
+def _log_error(message):
+    logger.warning("AI insights: %s", message)
+
+
+def request_ai_insights(summary, config, report_error=None):
+    """Fetch AI insights in one request; failures go to report_error"""
+    report_error = report_error or _log_error
+    if not summary.transaction_count:
+        return NO_DATA_MESSAGE
+    if not config.api_key:
+        return MISSING_KEY_MESSAGE
+
+    salary = summary.salary
+    total_spending = summary.total_spending
+    savings = summary.savings
+    savings_rate = summary.savings_rate
+    prompt = prepare_insights_prompt(summary)
+
+    try:
+        # Identical prompts (same salary and category totals) reuse the stored answer
+        response_cache = get_response_cache()
+        cache_key = response_cache.key_for(prompt.text, config.model_params)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        def complete():
+            _record_prompt(prompt)
+            content = get_llm_client(config.api_base).chat(
+                config.api_key,
+                [{"role": "user", "content": prompt.text}],
+                **config.model_params
+            )
+            # Stored before the flight ends, so callers arriving after it find the answer
+            response_cache.put(cache_key, content)
+            return content
+
+        try:
+            # Sessions asking for the same analysis at the same time share one upstream call
+            return get_single_flight().do(cache_key, complete)
+        except LLMError as e:
+            if e.status_code is None:
+                raise
+            report_error(f"API Error: {e.status_code}")
+            return f"AI service temporarily unavailable. Basic analysis: You're saving ₹{savings:,.0f} ({savings_rate:.1f}%) from your ₹{salary:,.0f} salary. Consider investing in SIP and reducing spending in {summary.top_category}."
+
+    except Exception as e:
+        report_error(f"Error: {str(e)}")
+        return f"AI analysis unavailable. Basic summary: Savings rate {savings_rate:.1f}%, total spending ₹{total_spending:,.0f} from ₹{salary:,.0f} salary."
+
+
+def stream_ai_insights(summary, config, report_error=None):
+    """Yield AI insight text as it is generated, falling back to a single request"""
+    if not summary.transaction_count or not config.api_key:
+        yield request_ai_insights(summary, config, report_error)
+        return
+
+    prompt = prepare_insights_prompt(summary)
+    response_cache = get_response_cache()
+    cache_key = response_cache.key_for(prompt.text, config.model_params)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    def upstream():
+        _record_prompt(prompt)
+        streamed = []
+        for delta in get_llm_client(config.api_base).stream_chat(
+            config.api_key,
+            [{"role": "user", "content": prompt.text}],
+            **config.model_params
+        ):
+            streamed.append(delta)
+            yield delta
+        response_cache.put(cache_key, "".join(streamed))
+
+    chunks = []
+    try:
+        # Identical concurrent requests from other sessions subscribe to this stream
+        for delta in get_single_flight().stream(cache_key, upstream):
+            chunks.append(delta)
+            yield delta
+    except LLMError:
+        if not chunks:
+            # Nothing shown yet, so the non-streaming path can answer instead
+            yield request_ai_insights(summary, config, report_error)
+        else:
+            yield "\n\n⚠️ The AI response was interrupted. Please try again."
@@ -0,0 +1,106 @@
+"""Persistent cache of LLM completions.
+
+Responses are keyed on the whitespace-normalized prompt plus the model
+parameters, stored in SQLite with a TTL and a maximum entry count (least
+recently used entries are evicted first), and shared by every session in the
+process. Only successful completions should be stored.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+LLM_CACHE_PATH = os.environ.get(
+    "FINANCE_BUDDY_LLM_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai-finance-buddy", "llm_responses.sqlite3")
+)
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("FINANCE_BUDDY_LLM_CACHE_TTL", str(24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("FINANCE_BUDDY_LLM_CACHE_MAX_ENTRIES", "1000"))
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+class ResponseCache:
+    """SQLite-backed prompt -> completion cache with TTL and max-size eviction"""
+
+    def __init__(self, path=":memory:", ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def key_for(prompt, params):
+        """Key for a prompt and its model parameters, ignoring whitespace layout"""
+        normalized = " ".join(prompt.split())
+        digest = hashlib.sha256(normalized.encode("utf-8"))
+        digest.update(b"\x1f")
+        digest.update(json.dumps(params, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Cached response for key, or None if absent or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+def get_response_cache():
+    """Process-wide response cache, falling back to memory if the file can't be opened"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResponseCache(LLM_CACHE_PATH)
+            except (OSError, sqlite3.Error):
+                _default_cache = ResponseCache(":memory:")
+        return _default_cache
@@ -0,0 +1,232 @@
+"""HTTP client for the Groq chat-completions API.
+
+One ``LLMClient`` per endpoint is shared by every caller in the process. It keeps
+a pooled keep-alive ``requests.Session``, caps concurrent upstream calls with a
+semaphore, retries 429/5xx and connection failures with exponential backoff and
+full jitter (honouring ``Retry-After``), and records per-call latency.
+``stream_chat`` consumes server-sent-event completions chunk by chunk.
+
+``requests`` is imported when the first client is created, keeping it off the
+app's startup path. ``GROQ_API_BASE`` points the client at any compatible endpoint, such as a local
+stub server.
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+GROQ_API_BASE = os.environ.get("GROQ_API_BASE", "https://api.groq.com/openai/v1")
+LLM_MAX_CONCURRENCY = int(os.environ.get("FINANCE_BUDDY_LLM_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.environ.get("FINANCE_BUDDY_LLM_RETRIES", "3"))
+LLM_TIMEOUT_SECONDS = 30
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class LLMError(Exception):
+    """Upstream call failed; status_code is None for connection errors and timeouts"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LLMClient:
+    """Pooled, rate-limited chat-completions client with retry and latency metrics"""
+
+    def __init__(self, base_url=GROQ_API_BASE, max_concurrency=LLM_MAX_CONCURRENCY,
+                 max_retries=LLM_MAX_RETRIES, timeout=LLM_TIMEOUT_SECONDS,
+                 backoff_base=0.5, backoff_max=8.0, retry_after_max=30.0):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        self._metrics_lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._queue_waits = deque(maxlen=1000)
+        self._first_token = deque(maxlen=1000)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+
+    def chat(self, api_key, messages, **params):
+        """Send a chat completion request and return the assistant message text"""
+        payload = {"messages": messages, **params}
+        response = self._post("/chat/completions", api_key, payload)
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"Malformed API response: {e}", response.status_code) from e
+
+    def stream_chat(self, api_key, messages, **params):
+        """Yield assistant text deltas as the server streams them.
+
+        Failures before the first chunk are retried like chat(); a failure
+        mid-stream raises LLMError after the text already yielded.
+        """
+        import requests
+
+        payload = {"messages": messages, **params, "stream": True}
+        start = time.perf_counter()
+        response = self._post("/chat/completions", api_key, payload, stream=True)
+        failed = True
+        first_token = None
+        try:
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8")
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                except (ValueError, KeyError, IndexError) as e:
+                    raise LLMError(f"Malformed stream chunk: {e}", response.status_code) from e
+                if delta:
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                        with self._metrics_lock:
+                            self._first_token.append(first_token)
+                    yield delta
+            failed = False
+        except GeneratorExit:
+            # The consumer stopped reading (e.g. the job was cancelled)
+            failed = False
+            raise
+        except requests.RequestException as e:
+            raise LLMError(str(e)) from e
+        finally:
+            response.close()
+            self._semaphore.release()
+            self._record_call(start, failed=failed)
+
+    def _post(self, path, api_key, payload, stream=False):
+        """POST with retries; returns the successful response or raises LLMError.
+
+        Non-streamed calls are recorded here. A streamed response keeps its
+        concurrency slot until the caller releases the semaphore after reading it.
+        """
+        import requests
+
+        url = f"{self.base_url}{path}"
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            queued = time.perf_counter()
+            self._semaphore.acquire()
+            self._record_wait(time.perf_counter() - queued)
+            keep_slot = False
+            try:
+                try:
+                    response = self.session.post(url, headers=headers, json=payload,
+                                                 timeout=self.timeout, stream=stream)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt == self.max_retries:
+                        self._record_call(start, failed=True)
+                        raise LLMError(str(e)) from e
+                    delay = self._backoff(attempt)
+                else:
+                    if response.status_code == 200:
+                        keep_slot = stream
+                        if not stream:
+                            self._record_call(start)
+                        return response
+                    status = response.status_code
+                    retry_after = response.headers.get("Retry-After")
+                    response.close()
+                    if status not in RETRY_STATUSES or attempt == self.max_retries:
+                        self._record_call(start, failed=True)
+                        raise LLMError(f"API Error: {status}", status)
+                    delay = self._backoff(attempt, retry_after)
+            finally:
+                if not keep_slot:
+                    self._semaphore.release()
+            with self._metrics_lock:
+                self.retries += 1
+            time.sleep(delay)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds to wait before the next attempt: Retry-After if given, else full jitter"""
+        if retry_after:
+            seconds = _parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.retry_after_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _record_wait(self, seconds):
+        with self._metrics_lock:
+            self._queue_waits.append(seconds)
+
+    def _record_call(self, start, failed=False):
+        with self._metrics_lock:
+            self.calls += 1
+            if failed:
+                self.errors += 1
+            self._latencies.append(time.perf_counter() - start)
+
+    def metrics(self):
+        """Call counters and latency percentiles (seconds) over recent calls"""
+        with self._metrics_lock:
+            latencies = sorted(self._latencies)
+            waits = sorted(self._queue_waits)
+            first_tokens = sorted(self._first_token)
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "retries": self.retries,
+                "latency_p50": _percentile(latencies, 0.50),
+                "latency_p95": _percentile(latencies, 0.95),
+                "latency_max": latencies[-1] if latencies else None,
+                "queue_wait_p95": _percentile(waits, 0.95),
+                "first_token_p50": _percentile(first_tokens, 0.50),
+            }
+
+
+def _parse_retry_after(value):
+    """Retry-After as seconds, from either delta-seconds or an HTTP date"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_llm_client(base_url=GROQ_API_BASE):
+    """Process-wide client for base_url, shared by every session"""
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _clients[base_url] = LLMClient(base_url)
+        return client
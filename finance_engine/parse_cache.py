@@ -0,0 +1,173 @@
+"""Content-addressed cache of parsed statements.
+
+Every Streamlit rerun sees the uploaded file again. Parsing is keyed on a hash
+of the raw bytes, the input kind and ``PARSER_VERSION``, so unchanged uploads
+(and identical uploads from other sessions) cost one hash and a lookup. Results
+live in a size-bounded in-memory LRU with an optional on-disk tier.
+
+Cached stores are shared between sessions and must be treated as read-only.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from .parsers import PARSER_VERSION
+from .tracing import stage
+
+PARSE_CACHE_MAX_MB = int(os.environ.get("FINANCE_BUDDY_PARSE_CACHE_MB", "256"))
+PARSE_CACHE_DIR = os.environ.get("FINANCE_BUDDY_PARSE_CACHE_DIR") or None
+PARSE_CACHE_DISK_MAX_MB = int(os.environ.get("FINANCE_BUDDY_PARSE_CACHE_DISK_MB", "2048"))
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def _entry_size(value):
+    """Approximate memory held by a (store, preview) parse result; preview may be None"""
+    store, preview = value
+    if preview is None:
+        return store.nbytes
+    return store.nbytes + int(preview.memory_usage(deep=True).sum())
+
+
+class ParseCache:
+    """In-memory LRU of parse results, evicted by size, with an optional disk tier"""
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(content, kind):
+        """Cache key for raw input bytes of the given kind under the current parser version"""
+        digest = hashlib.blake2b(content, digest_size=20)
+        digest.update(f"\x1f{kind}\x1f{PARSER_VERSION}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_or_parse(self, content, kind, parse):
+        """Return the cached result for content, calling parse() only on a miss"""
+        with stage(f"parse_cache[{kind}]"):
+            key = self.key_for(content, kind)
+            value = self.get(key)
+            if value is None:
+                with stage("parse (cache miss)"):
+                    value = parse()
+                self.put(key, value)
+            return value
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._put_memory(key, value)
+        return value
+
+    def put(self, key, value):
+        self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def _put_memory(self, key, value):
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+            return value
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop least recently used files until the disk tier fits its budget"""
+        try:
+            entries = []
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.pkl'):
+                    stat = os.stat(os.path.join(self.disk_dir, name))
+                    entries.append((stat.st_mtime, stat.st_size, name))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+def get_parse_cache():
+    """Process-wide cache shared by all sessions, configured from the environment"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache(
+                PARSE_CACHE_MAX_MB * 1024 * 1024,
+                disk_dir=PARSE_CACHE_DIR,
+                disk_max_bytes=PARSE_CACHE_DISK_MAX_MB * 1024 * 1024
+            )
+        return _default_cache
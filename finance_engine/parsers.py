@@ -0,0 +1,420 @@
+"""Plain text and PDF statement parsers.
+
+Both inputs share one line parser: a precompiled token pattern finds every
+date and amount on a line in a single scan, and parsed lines are collected
+into column lists (descriptions, amounts, dates) in batches rather than
+per-row records. Each line's description is mapped onto a bounded category set by the merchant
+classifier (``classify``); the original text is kept in a Description column
+for the preview.
+
+PDF text extraction is CPU-bound and page-independent, so large documents are
+split into contiguous page ranges and extracted on a process pool. This module
+holds the pool worker so spawned processes can import it by name, which is not
+possible for functions defined in the Streamlit script itself.
+"""
+import atexit
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from io import BytesIO
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from .classify import get_classifier
+from .tracing import stage, traced
+
+# Bump whenever parse or normalize output changes; it is part of the parse cache key
+PARSER_VERSION = 9
+
+# PDFs with fewer pages than this are parsed in-process
+PARALLEL_PDF_MIN_PAGES = 16
+
+# Worker processes for PDF extraction; 0 or unset means one per CPU
+PDF_WORKERS = int(os.environ.get("FINANCE_BUDDY_PDF_WORKERS", "0")) or os.cpu_count() or 1
+
+# Page ranges handed out per worker, so uneven pages still balance across the pool
+_TASKS_PER_WORKER = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+_MONTHS = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1
+)}
+
+_DATE = r"""
+    (?P<iso_year>\d{4})-(?P<iso_month>\d{1,2})-(?P<iso_day>\d{1,2})
+  | (?P<day>\d{1,2})[/.-](?P<month>\d{1,2})[/.-](?P<year>\d{4}|\d{2})
+  | (?P<name_day>\d{1,2})[ -](?P<month_name>[A-Za-z]{3})[A-Za-z]*[ ,-]+(?P<name_year>\d{4}|\d{2})
+"""
+# The same dates without groups, for capturing one whole
+_DATE_TEXT = r"(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.-]\d{1,2}[/.-](?:\d{4}|\d{2})|\d{1,2}[ -][A-Za-z]{3}[A-Za-z]*[ ,-]+(?:\d{4}|\d{2}))"
+_CURRENCY = r"₹|[Rr][Ss]\.?|INR|inr|Inr"
+_NUMBER = r"\d+(?:,\d{2,3})*"
+
+# One date or amount anywhere on a statement line. Dates as printed on Indian
+# statements: 2024-03-05, 05/03/2024, 05-03-24, 05.03.2024, 05 Mar 2024,
+# 05-Mar-24 (numeric dates are day first). Amounts: 450, 1,25,000.50 (Indian
+# or Western grouping), ₹450, Rs.1,250/-, INR 99, with an optional Dr/Cr marker.
+_TOKEN = re.compile(rf"""
+    (?<![\w/.-])
+    (?:
+        {_DATE}
+      | (?P<currency>{_CURRENCY})?[ ]?(?P<number>{_NUMBER})(?P<fraction>\.\d{{1,2}})?(?:/-)?
+        (?:[ ]?(?P<marker>[DdCc][Rr])\.?)?
+    )
+    (?![\w/-])
+""", re.VERBOSE)
+
+# The common line shapes, matched over a whole chunk of text at once: an
+# optional leading date, a description whose words are not amounts or dates
+# (terminal and reference numbers of three or more digits are allowed), the
+# amount with optional currency and Dr/Cr, and an optional running
+# balance. Any other line is captured whole (with no `number`) for the
+# token scan.
+_DESCRIPTION_WORD = rf"""
+    (?!(?:{_CURRENCY})[ ]?\d)(?:[^\s\d₹]\S*|\d+[^\s\d.,/-]\S*)
+  | \d{{3,}}(?=[ \t])(?![ ]?[DdCc][Rr](?![\w/-]))
+"""
+_FAST_LINE = re.compile(rf"""
+    ^(?P<line>
+        [ \t]*
+        (?:(?P<date>{_DATE_TEXT})[ \t]+)?
+        (?P<description>(?:{_DESCRIPTION_WORD})(?:[ \t]+(?:{_DESCRIPTION_WORD}))*)
+        [ \t]+
+        (?P<currency>(?:{_CURRENCY})[ ]?)?
+        (?P<number>{_NUMBER})(?P<fraction>\.\d{{1,2}})?(?:/-)?
+        (?:[ \t]*(?P<marker>[DdCc][Rr])\.?)?
+        (?:[ \t]+(?P<balance>{_NUMBER}(?:\.\d{{1,2}})?))?
+        [ \t\r]*
+      | [^\n]*
+    )$
+""", re.MULTILINE | re.VERBOSE)
+_DATE_ONLY = re.compile(_DATE, re.VERBOSE)
+_NUMBER_WORD = re.compile(r"(?<!\S)\d+(?!\S)")
+
+# Trimmed from the ends of a description once the amount and dates are cut out
+_DESCRIPTION_EDGES = " -:|/,;"
+
+# Characters of text parsed into one columnar batch (whole lines, about 40k of them)
+TEXT_BATCH_CHARS = 2 * 1024 * 1024
+
+
+def _match_date(match):
+    """ISO date string for a match with date groups, or None if it is not a real date"""
+    try:
+        if match.group('iso_year'):
+            year, month, day = match.group('iso_year', 'iso_month', 'iso_day')
+        elif match.group('year'):
+            year, month, day = match.group('year', 'month', 'day')
+        else:
+            year, day = match.group('name_year', 'name_day')
+            month = _MONTHS.get(match.group('month_name').lower())
+            if month is None:
+                return None
+        year = int(year)
+        if year < 100:
+            year += 2000
+        return date(year, int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def _text_between(line, start, stop, cuts):
+    """line[start:stop] without the (start, stop) spans in cuts, whitespace collapsed"""
+    if cuts:
+        pieces = []
+        for cut_start, cut_stop in cuts:
+            if cut_stop <= start or cut_start >= stop:
+                continue
+            pieces.append(line[start:cut_start])
+            start = cut_stop
+        pieces.append(line[start:stop])
+        text = " ".join(pieces)
+    else:
+        text = line[start:stop]
+    return " ".join(text.split()).strip(_DESCRIPTION_EDGES)
+
+
+def _scan_line(line):
+    """(description, amount, date or None) for any line the fast pattern did not take, or None.
+
+    The amount is the first one marked with a currency or Dr/Cr, else the first
+    with digit grouping or paise, else the last plain number (so counts and
+    reference numbers before it are skipped). The first valid date is taken and
+    the text before the amount, with dates cut out, is the description.
+    """
+    best = None
+    best_rank = -1
+    line_date = None
+    cuts = None
+    for token in _TOKEN.finditer(line):
+        number = token.group('number')
+        if number is None:
+            parsed = _match_date(token)
+            if parsed:
+                if cuts is None:
+                    cuts = []
+                    line_date = parsed
+                cuts.append(token.span())
+            continue
+        if token.group('currency') or token.group('marker'):
+            rank = 2
+        elif token.group('fraction') or ',' in number:
+            rank = 1
+        else:
+            rank = 0
+        if rank > best_rank or rank == best_rank == 0:
+            best, best_rank = token, rank
+    if best is None:
+        return None
+    marker = best.group('marker')
+    if marker and marker[0] in 'Cc':
+        return None
+    start, stop = best.span()
+    description = _text_between(line, 0, start, cuts) or _text_between(line, stop, len(line), cuts)
+    if not description:
+        return None
+    return description, float(best.group('number').replace(',', '') + (best.group('fraction') or '')), line_date
+
+
+def _parse_date_text(text):
+    """ISO date for a captured date, or "" if it is not a real date"""
+    match = _DATE_ONLY.fullmatch(text)
+    return (_match_date(match) if match else None) or ""
+
+
+def _text_chunks(text, chunk_chars):
+    """Slices of text of about chunk_chars characters, split between lines"""
+    start = 0
+    while start < len(text):
+        stop = text.find('\n', start + chunk_chars)
+        if stop == -1:
+            stop = len(text)
+        yield text[start:stop]
+        start = stop + 1
+
+
+def _parse_chunk(text):
+    """``(descriptions, amounts, dates)`` arrays for the lines of one chunk"""
+    descriptions, amounts, dates = [], [], []
+    add_description, add_amount, add_date = descriptions.append, amounts.append, dates.append
+    # Statements repeat the same few dates on many lines
+    parsed_dates = {}
+    for match in _FAST_LINE.finditer(text):
+        line, date_text, description, currency, number, fraction, marker, balance = match.group(
+            'line', 'date', 'description', 'currency', 'number', 'fraction', 'marker', 'balance'
+        )
+        row = None
+        if number is None:
+            # Not one of the common shapes
+            if line.strip():
+                row = _scan_line(line)
+        elif not (currency or fraction or marker or ',' in number) and (
+            balance or _NUMBER_WORD.search(description)
+        ):
+            # A plain amount beside other plain numbers: the scan picks which one is spent
+            row = _scan_line(line)
+        else:
+            line_date = None
+            if date_text:
+                line_date = parsed_dates.get(date_text)
+                if line_date is None:
+                    line_date = parsed_dates[date_text] = _parse_date_text(date_text)
+            description = description.strip(_DESCRIPTION_EDGES)
+            if '  ' in description or '\t' in description:
+                description = " ".join(description.split())
+            if line_date == "" or not description:
+                row = _scan_line(line)
+            elif marker and marker[0] in 'Cc':
+                continue
+            else:
+                row = description, float(number.replace(',', '') + (fraction or '')), line_date
+        if row is not None:
+            add_description(row[0])
+            add_amount(row[1])
+            add_date(row[2])
+    return np.array(descriptions, dtype=object), np.array(amounts, dtype=np.float64), np.array(dates, dtype=object)
+
+
+def iter_text_batches(text, batch_chars=TEXT_BATCH_CHARS):
+    """Parse statement text, yielding ``(descriptions, amounts, dates)`` column batches.
+
+    Each chunk of lines is matched by one multi-line pattern, so the common
+    line shapes are split into date, description and amount by the regex
+    engine in a single pass; other lines go through _scan_line. Credit (Cr)
+    lines are money in, not spending, and are skipped, as are lines with no
+    amount or no description. Undated rows have date None.
+    """
+    for chunk in _text_chunks(text, batch_chars):
+        batch = _parse_chunk(chunk)
+        if len(batch[0]):
+            yield batch
+
+
+def iter_line_batches(lines, batch_chars=TEXT_BATCH_CHARS):
+    """iter_text_batches over a sequence of lines"""
+    return iter_text_batches("\n".join(lines), batch_chars)
+
+
+def parse_lines(lines):
+    """All of iter_line_batches(lines) as one ``(descriptions, amounts, dates)`` batch"""
+    return _join_batches(iter_line_batches(lines))
+
+
+def _join_batches(batches):
+    batches = list(batches)
+    if not batches:
+        return np.empty(0, dtype=object), np.empty(0), np.empty(0, dtype=object)
+    return tuple(np.concatenate(column) for column in zip(*batches))
+
+
+def batch_to_frame(batch, today=None, typed=False):
+    """Raw Category/Description/Amount/Date frame for one batch; undated rows get today's date
+
+    ``typed`` lines were entered by the user, so unknown descriptions stay
+    their own category; statement narrations without a known merchant are Other.
+    """
+    descriptions, amounts, dates = batch
+    if not len(descriptions):
+        return pd.DataFrame()
+    today = today or date.today().isoformat()
+    with stage("classify", rows=len(descriptions)):
+        # Each distinct description is classified once
+        codes, uniques = pd.factorize(descriptions)
+        categories = np.asarray(get_classifier().classify_many(uniques, typed), dtype=object)[codes]
+    return pd.DataFrame({
+        'Category': categories,
+        'Description': descriptions,
+        'Amount': np.asarray(amounts, dtype=np.float64),
+        'Date': pd.Series(dates, dtype=object).fillna(today).to_numpy(),
+    })
+
+
+def iter_text_frames(text, batch_chars=TEXT_BATCH_CHARS, typed=True):
+    """Raw frames for pasted statement text, one per batch of parsed lines"""
+    today = date.today().isoformat()
+    for batch in iter_text_batches(text, batch_chars):
+        yield batch_to_frame(batch, today, typed)
+
+
+@traced("parse_text_input", rows=len)
+def parse_text_input(text, typed=True):
+    """Parse plain text input into DataFrame; pass typed=False for statement narrations"""
+    frames = list(iter_text_frames(text, typed=typed))
+    if len(frames) <= 1:
+        return frames[0] if frames else pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _parse_pages(pdf, start, stop):
+    texts = (page.extract_text() for page in pdf.pages[start:stop])
+    return _join_batches(iter_text_batches("\n".join(text for text in texts if text)))
+
+
+def _parse_pdf_range(path, start, stop):
+    """Pool worker: open the PDF file independently and parse pages [start, stop)"""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return _parse_pages(pdf, start, stop)
+
+
+def _get_pool():
+    """Process-wide pool of PDF_WORKERS processes, shared by every parse and never resized"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn avoids forking a multi-threaded Streamlit server
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(_shutdown_pool)
+
+
+def _page_ranges(page_count, tasks):
+    """Split page_count pages into at most `tasks` contiguous (start, stop) ranges"""
+    tasks = max(1, min(tasks, page_count))
+    step, extra = divmod(page_count, tasks)
+    ranges = []
+    start = 0
+    for i in range(tasks):
+        stop = start + step + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+@traced("parse_pdf", rows=len)
+def parse_pdf(pdf_file, workers=None, min_parallel_pages=PARALLEL_PDF_MIN_PAGES):
+    """Parse PDF file and extract financial data.
+
+    Documents with at least ``min_parallel_pages`` pages are split into page
+    ranges and parsed on the shared pool of ``PDF_WORKERS`` processes, with at
+    most ``workers`` (default and at most ``PDF_WORKERS``) of its ranges
+    running at once; the rows are merged back in page order.
+    Smaller documents, or ``workers=1``, parse serially. Workers open the file
+    themselves, so an upload is written to one temporary file rather than
+    copied into every task.
+    """
+    import pdfplumber
+
+    workers = min(workers or PDF_WORKERS, PDF_WORKERS)
+    if isinstance(pdf_file, (str, os.PathLike)):
+        source = os.fspath(pdf_file)
+    else:
+        source = pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
+
+    with pdfplumber.open(BytesIO(source) if isinstance(source, bytes) else source) as pdf:
+        page_count = len(pdf.pages)
+        if workers <= 1 or page_count < min_parallel_pages:
+            return batch_to_frame(_parse_pages(pdf, 0, page_count))
+
+    path, temporary = source, isinstance(source, bytes)
+    if temporary:
+        with tempfile.NamedTemporaryFile(prefix="finance-buddy-", suffix=".pdf", delete=False) as f:
+            f.write(source)
+            path = f.name
+    try:
+        ranges = _page_ranges(page_count, workers * _TASKS_PER_WORKER)
+        try:
+            pool = _get_pool()
+            # At most `workers` ranges of this document are in the pool at once;
+            # the next one is submitted as each finishes
+            results = [None] * len(ranges)
+            pending = {}
+            queued = iter(enumerate(ranges))
+            for index, (start, stop) in islice(queued, workers):
+                pending[pool.submit(_parse_pdf_range, path, start, stop)] = index
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+                    for index, (start, stop) in islice(queued, 1):
+                        pending[pool.submit(_parse_pdf_range, path, start, stop)] = index
+            # Ranges come back as column arrays, joined in page order
+            columns = _join_batches(results)
+        except BrokenProcessPool:
+            _shutdown_pool()
+            columns = _parse_pdf_range(path, 0, page_count)
+    finally:
+        if temporary:
+            os.remove(path)
+    return batch_to_frame(columns)
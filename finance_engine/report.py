@@ -0,0 +1,101 @@
+"""Plain-text financial report rendered from a FinancialSummary"""
+from datetime import datetime
+
+from .tracing import traced
+
+
+@traced("generate_financial_report")
+def generate_financial_report(summary):
+    """Generate downloadable financial report"""
+    if not summary.transaction_count:
+        return "No data available for analysis."
+    
+    salary = summary.salary
+    total_spending = summary.total_spending
+    savings = summary.savings
+    savings_rate = summary.savings_rate
+    # Over several months the overview shows period totals; plans use monthly averages
+    label = "Monthly" if summary.months == 1 else f"{summary.months}-Month"
+    monthly_savings = summary.monthly_savings
+    monthly_spending = summary.monthly_spending
+    
+    # Generate formatted report
+    report = f"""
+═══════════════════════════════════════════════════════════════
+                    AI FINANCE BUDDY - FINANCIAL REPORT
+═══════════════════════════════════════════════════════════════
+
+📊 FINANCIAL OVERVIEW
+─────────────────────────────────────────────────────────────
+Period:                   {summary.period}
+{label + " Salary:":<26}₹{salary:,.0f}
+{"Total " + label + " Spending:":<26}₹{total_spending:,.0f}
+{label + " Savings:":<26}₹{savings:,.0f}
+Savings Rate:             {savings_rate:.1f}%
+
+💰 SPENDING BREAKDOWN
+─────────────────────────────────────────────────────────────
+"""
+    
+    for category, amount in summary.sorted_categories():
+        percentage = (amount / total_spending * 100) if total_spending > 0 else 0
+        report += f"{category:<20} ₹{amount:>8,.0f} ({percentage:>5.1f}%)\n"
+    
+    report += f"""
+
+🎯 FINANCIAL HEALTH ASSESSMENT
+─────────────────────────────────────────────────────────────
+"""
+    
+    if savings_rate >= 20:
+        report += "✅ EXCELLENT: Your savings rate is outstanding!\n"
+    elif savings_rate >= 10:
+        report += "⚠️  GOOD: Your savings rate is decent but can be improved.\n"
+    else:
+        report += "❌ NEEDS IMPROVEMENT: Your savings rate is below recommended levels.\n"
+    
+    report += f"""
+
+📈 INVESTMENT RECOMMENDATIONS
+─────────────────────────────────────────────────────────────
+Recommended Monthly SIP:  ₹{max(1000, monthly_savings * 0.6):,.0f}
+Emergency Fund Target:    ₹{monthly_spending * 6:,.0f}
+
+Suggested Indian Stocks:
+• Reliance Industries (RELIANCE)
+• Tata Consultancy Services (TCS)
+• HDFC Bank (HDFCBANK)
+• Infosys (INFY)
+• ICICI Bank (ICICIBANK)
+
+Mutual Fund Categories:
+• Large Cap Funds: 40% allocation
+• Mid Cap Funds: 30% allocation
+• Small Cap Funds: 20% allocation
+• Debt Funds: 10% allocation
+
+✂️ COST CUTTING OPPORTUNITIES
+─────────────────────────────────────────────────────────────
+"""
+    
+    # Find top 3 spending categories
+    top_categories = summary.sorted_categories()[:3]
+    for i, (category, amount) in enumerate(top_categories, 1):
+        potential_saving = amount * 0.15  # 15% reduction
+        report += f"{i}. {category}: Reduce by ₹{potential_saving:,.0f} (15% cut)\n"
+    
+    report += f"""
+
+💡 ACTIONABLE STEPS
+─────────────────────────────────────────────────────────────
+1. Set up automatic SIP of ₹{max(1000, monthly_savings * 0.6):,.0f}/month
+2. Build emergency fund of ₹{monthly_spending * 6:,.0f}
+3. Track expenses weekly using this app
+4. Review and optimize spending monthly
+5. Consider tax-saving investments (ELSS, PPF)
+
+📅 Generated on: {datetime.now().strftime('%d %B %Y at %I:%M %p')}
+═══════════════════════════════════════════════════════════════
+"""
+    
+    return report
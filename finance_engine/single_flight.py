@@ -0,0 +1,168 @@
+"""Process-wide coalescing of identical in-flight LLM calls.
+
+When several sessions ask for the same analysis at once (everyone loading the
+sample data and clicking Generate together), only the first caller for a key
+goes upstream; the others join its flight and receive the same result.
+``do`` shares a single return value (or exception). ``stream`` shares a
+stream of chunks: every subscriber replays the chunks produced so far and
+then receives new ones as they arrive. The shared stream is advanced by
+whichever subscriber needs the next chunk, so the flight carries on if the
+caller that started it stops reading, and the upstream stream is closed once
+no subscriber is left.
+
+A flight ends with its call, so later callers start a new one; pair it with
+the response cache, filled before the flight ends, to serve those.
+"""
+import os
+import threading
+
+# Set to 0 to send every call upstream on its own
+COALESCE_ENABLED = os.environ.get("FINANCE_BUDDY_LLM_COALESCE", "1").lower() not in ("0", "false", "no")
+
+_default_flights = None
+_default_lock = threading.Lock()
+
+
+class _Flight:
+    """State of one in-flight call shared by its subscribers"""
+
+    def __init__(self, make_stream=None):
+        self.make_stream = make_stream
+        self.iterator = None
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self.pumping = False
+        self.subscribers = 0
+        self.condition = threading.Condition()
+
+
+class SingleFlight:
+    """Calls keyed by fingerprint; concurrent calls with the same key share one execution"""
+
+    def __init__(self, enabled=COALESCE_ENABLED):
+        self.enabled = enabled
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key, make_stream=None):
+        """(flight, True if this caller started it)"""
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key) if self.enabled else None
+            leader = flight is None
+            if leader:
+                flight = _Flight(make_stream)
+                self.executions += 1
+                if self.enabled:
+                    self._flights[key] = flight
+            else:
+                self.coalesced += 1
+            flight.subscribers += 1
+            return flight, leader
+
+    def _finish(self, key, flight, result=None, error=None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.condition:
+            flight.result, flight.error, flight.done = result, error, True
+            flight.condition.notify_all()
+
+    def do(self, key, func):
+        """func() for the first caller with this key; concurrent callers get the same result or exception"""
+        flight, leader = self._join(key)
+        if leader:
+            try:
+                result = func()
+            except BaseException as e:
+                self._finish(key, flight, error=e)
+                raise
+            self._finish(key, flight, result=result)
+            return result
+        with flight.condition:
+            while not flight.done:
+                flight.condition.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stream(self, key, make_stream):
+        """Chunks of make_stream(), shared with every concurrent caller using the same key"""
+        # Joined on first iteration, so a stream that is never read holds no flight open
+        flight, _ = self._join(key, make_stream)
+        yield from self._subscribe(key, flight)
+
+    def _subscribe(self, key, flight):
+        index = 0
+        try:
+            while True:
+                pump = False
+                with flight.condition:
+                    while index >= len(flight.chunks) and not flight.done and flight.pumping:
+                        flight.condition.wait()
+                    if index < len(flight.chunks):
+                        chunk = flight.chunks[index]
+                        index += 1
+                    elif flight.done:
+                        if flight.error is not None:
+                            raise flight.error
+                        return
+                    else:
+                        # Nobody is reading upstream: this subscriber fetches the next chunk
+                        flight.pumping = pump = True
+                if pump:
+                    self._pump(key, flight)
+                else:
+                    yield chunk
+        finally:
+            with flight.condition:
+                flight.subscribers -= 1
+                abandoned = not flight.subscribers and not flight.done
+            if abandoned:
+                # Every subscriber stopped reading: close the upstream stream
+                close = getattr(flight.iterator, "close", None)
+                if close is not None:
+                    close()
+                self._finish(key, flight)
+
+    def _pump(self, key, flight):
+        """Advance the shared stream by one chunk; called by one subscriber at a time"""
+        try:
+            if flight.iterator is None:
+                flight.iterator = iter(flight.make_stream())
+            chunk = next(flight.iterator)
+        except StopIteration:
+            self._finish(key, flight)
+        except BaseException as e:
+            self._finish(key, flight, error=e)
+        else:
+            with flight.condition:
+                flight.chunks.append(chunk)
+        finally:
+            with flight.condition:
+                flight.pumping = False
+                flight.condition.notify_all()
+
+    def metrics(self):
+        """Calls made, upstream executions and calls that joined another's flight"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
+
+
+def get_single_flight():
+    """Process-wide flight group shared by every session"""
+    global _default_flights
+    with _default_lock:
+        if _default_flights is None:
+            _default_flights = SingleFlight()
+        return _default_flights
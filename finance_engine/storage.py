@@ -0,0 +1,442 @@
+"""Persistent per-user transaction history.
+
+Two interchangeable backends implement ``TransactionStorage``:
+
+- ``SQLiteStorage`` keeps one row per transaction in a single database file,
+  indexed on (user, day, category), and answers aggregates in SQL.
+- ``ParquetStorage`` keeps a directory of Parquet files per user (one per
+  write, categories dictionary-encoded) and scans them with pyarrow, pushing
+  date filters and column projection down to the files. A save starts a new
+  generation of files and readers only see the newest generation, so a
+  reader racing a save gets the old history or the new one, never both.
+
+Both bulk-insert a whole ``TransactionStore``, load it back (optionally only a
+range of months) and answer category/month totals and a ``FinancialSummary``
+without materializing rows. Every write gives the user's history a new random
+revision, so ``(user, revision)`` identifies stored content for caching.
+
+Storage trusts the user name it is given. The app derives it from a signed-in
+identity or from a secret history key (``history_owner``), never from text a
+visitor can guess, such as an email address.
+"""
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from itertools import repeat
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from .columnar import store_from_table, table_from_store
+from .store import TransactionStore, _to_month, build_summary
+from .tracing import traced
+
+_DATA_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "ai-finance-buddy")
+
+# "sqlite" or "parquet"
+STORAGE_BACKEND = os.environ.get("FINANCE_BUDDY_STORAGE", "sqlite").lower()
+STORAGE_PATH = os.environ.get("FINANCE_BUDDY_STORAGE_PATH") or os.path.join(
+    _DATA_DIR, "history.sqlite3" if STORAGE_BACKEND == "sqlite" else "history-parquet"
+)
+
+# Times a Parquet read lists the current generation again after a concurrent save removed it
+_READ_ATTEMPTS = 3
+
+# Shortest history key accepted; generated keys are 32 characters
+HISTORY_KEY_MIN_LENGTH = 20
+
+_default_storage = None
+_default_lock = threading.Lock()
+
+
+def new_history_key():
+    """Random secret owning a saved history; whoever holds it can load that history"""
+    return secrets.token_urlsafe(24)
+
+
+def history_owner(key=None, account=None):
+    """Storage user for a signed-in account id, or else for a secret history key
+
+    Only a hash of the key is stored, so the key cannot be read back out of storage.
+    """
+    if account:
+        return "account-" + hashlib.sha256(account.encode('utf-8')).hexdigest()
+    if not key or len(key) < HISTORY_KEY_MIN_LENGTH:
+        raise ValueError(f"history keys are at least {HISTORY_KEY_MIN_LENGTH} characters")
+    return "key-" + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _first_day(month):
+    return int(np.int64(month).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64))
+
+
+def _month_days(start, end):
+    """Half-open [first day, day after last) bounds, in days since 1970-01-01, for a month range"""
+    lo = None if start is None else _first_day(_to_month(start))
+    hi = None if end is None else _first_day(_to_month(end) + 1)
+    return lo, hi
+
+
+def _day_month(day):
+    return int(np.datetime64(int(day), 'D').astype('datetime64[M]').astype(np.int64))
+
+
+class TransactionStorage(ABC):
+    """Interface shared by the storage backends"""
+
+    @abstractmethod
+    def save(self, user, store):
+        """Replace the user's history with the store's transactions"""
+
+    @abstractmethod
+    def append(self, user, store):
+        """Add the store's transactions to the user's history"""
+
+    @abstractmethod
+    def load(self, user, start=None, end=None):
+        """The user's history, or the months start..end of it, as a TransactionStore"""
+
+    @abstractmethod
+    def info(self, user):
+        """{"revision", "rows", "updated_at"} for a stored user, or None"""
+
+    @abstractmethod
+    def users(self):
+        """Every user with stored history"""
+
+    @abstractmethod
+    def delete(self, user):
+        """Remove the user's history"""
+
+    @abstractmethod
+    def _aggregate(self, user, lo, hi):
+        """(categories, totals, counts, first day, last day) over days [lo, hi)"""
+
+    def revision(self, user):
+        info = self.info(user)
+        return info["revision"] if info else None
+
+    def category_totals(self, user, start=None, end=None):
+        """{category: spending} for the user's history or a range of months"""
+        categories, totals, _, _, _ = self._aggregate(user, *_month_days(start, end))
+        return dict(zip(categories, np.asarray(totals).tolist()))
+
+    def summary(self, user, salary, start=None, end=None):
+        """FinancialSummary computed from stored aggregates, without loading the rows"""
+        categories, totals, counts, first_day, last_day = self._aggregate(user, *_month_days(start, end))
+        if first_day is None:
+            first_day = last_day = int(np.datetime64('today', 'D').astype(np.int64))
+        first = _to_month(start) if start is not None else _day_month(first_day)
+        last = _to_month(end) if end is not None else _day_month(last_day)
+        version = f"{type(self).__name__}:{user}:{self.revision(user)}"
+        return build_summary(salary, first, last, categories, totals, counts, version)
+
+
+class SQLiteStorage(TransactionStorage):
+    """Transaction history in one SQLite file, one row per transaction"""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS transactions ("
+            " user TEXT NOT NULL,"
+            " day INTEGER NOT NULL,"  # days since 1970-01-01
+            " category TEXT NOT NULL,"
+            " amount REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS transactions_user_day ON transactions (user, day, category);"
+            "CREATE INDEX IF NOT EXISTS transactions_user_category ON transactions (user, category);"
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " user TEXT PRIMARY KEY,"
+            " revision TEXT NOT NULL,"
+            " row_count INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL);"
+        )
+        self._conn.commit()
+
+    def _insert(self, user, store):
+        names = np.asarray(store.categories, dtype=object)[store.category_codes] if len(store) else []
+        self._conn.executemany(
+            "INSERT INTO transactions (user, day, category, amount) VALUES (?, ?, ?, ?)",
+            zip(repeat(user), store.dates.astype(np.int64).tolist(), list(names), store.amounts.tolist())
+        )
+        rows = self._conn.execute("SELECT COUNT(*) FROM transactions WHERE user = ?", (user,)).fetchone()[0]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO profiles (user, revision, row_count, updated_at) VALUES (?, ?, ?, ?)",
+            (user, uuid.uuid4().hex, rows, time.time())
+        )
+
+    @traced("storage.save")
+    def save(self, user, store):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions WHERE user = ?", (user,))
+            self._insert(user, store)
+
+    @traced("storage.append")
+    def append(self, user, store):
+        with self._lock, self._conn:
+            self._insert(user, store)
+
+    def _where(self, user, lo, hi):
+        clause, params = "user = ?", [user]
+        if lo is not None:
+            clause += " AND day >= ?"
+            params.append(lo)
+        if hi is not None:
+            clause += " AND day < ?"
+            params.append(hi)
+        return clause, params
+
+    @traced("storage.load", rows=len)
+    def load(self, user, start=None, end=None):
+        clause, params = self._where(user, *_month_days(start, end))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT day, category, amount FROM transactions WHERE {clause} ORDER BY day, rowid", params
+            ).fetchall()
+        if not rows:
+            return TransactionStore.empty()
+        days, names, amounts = zip(*rows)
+        codes, categories = pd.factorize(pd.Series(names, dtype=object), sort=False)
+        return TransactionStore.from_columns(
+            amounts, codes, [str(c) for c in categories], np.asarray(days, dtype=np.int64).astype('datetime64[D]')
+        )
+
+    def info(self, user):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revision, row_count, updated_at FROM profiles WHERE user = ?", (user,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"revision": row[0], "rows": row[1], "updated_at": row[2]}
+
+    def users(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT user FROM profiles ORDER BY user")]
+
+    def delete(self, user):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions WHERE user = ?", (user,))
+            self._conn.execute("DELETE FROM profiles WHERE user = ?", (user,))
+
+    @traced("storage.aggregate")
+    def _aggregate(self, user, lo, hi):
+        clause, params = self._where(user, lo, hi)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT category, SUM(amount), COUNT(*) FROM transactions WHERE {clause} GROUP BY category", params
+            ).fetchall()
+            first_day, last_day = self._conn.execute(
+                f"SELECT MIN(day), MAX(day) FROM transactions WHERE {clause}", params
+            ).fetchone()
+        categories = [row[0] for row in rows]
+        return categories, [row[1] for row in rows], [row[2] for row in rows], first_day, last_day
+
+    def monthly_totals(self, user):
+        """[(YYYY-MM, category, spending, count)] for every month and category"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT strftime('%Y-%m', day * 86400, 'unixepoch') AS month, category, SUM(amount), COUNT(*)"
+                " FROM transactions WHERE user = ? GROUP BY month, category ORDER BY month, category",
+                (user,)
+            ).fetchall()
+
+
+class ParquetStorage(TransactionStorage):
+    """Transaction history as a directory of Parquet files per user"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _user_dir(self, user):
+        # Prefixed so names like ".." stay inside the root
+        return os.path.join(self.root, "user-" + quote(user, safe=""))
+
+    def _all_parts(self, user):
+        """Names of every part file in the user's directory, oldest generation first"""
+        try:
+            names = os.listdir(self._user_dir(user))
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.startswith("g") and name.endswith(".parquet"))
+
+    def _parts(self, user):
+        """Paths of the current (newest) generation's parts, in write order"""
+        names = self._all_parts(user)
+        if not names:
+            return []
+        current = names[-1].split("-", 1)[0]
+        directory = self._user_dir(user)
+        return [os.path.join(directory, name) for name in names if name.split("-", 1)[0] == current]
+
+    def _read_current(self, user, read):
+        """read(current parts), listing them again if a save in another process removes them mid-read"""
+        for attempt in range(_READ_ATTEMPTS):
+            parts = self._parts(user)
+            if not parts:
+                return None
+            try:
+                return read(parts)
+            except FileNotFoundError:
+                if attempt == _READ_ATTEMPTS - 1:
+                    raise
+
+    def _write(self, user, store, generation):
+        import pyarrow.parquet as pq
+
+        directory = self._user_dir(user)
+        os.makedirs(directory, exist_ok=True)
+        # Zero-padded generation then write time, so names sort by generation and
+        # write order; the uuid makes each name, which is the revision, unique
+        name = f"g{generation:020d}-{time.time_ns():020d}-{uuid.uuid4().hex}.parquet"
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table_from_store(store), tmp_path)
+        os.replace(tmp_path, os.path.join(directory, name))
+        return name
+
+    @staticmethod
+    def _generation(name):
+        return int(name.split("-", 1)[0][1:])
+
+    @traced("storage.save")
+    def save(self, user, store):
+        with self._lock:
+            old_names = self._all_parts(user)
+            generation = time.time_ns()
+            if old_names:
+                generation = max(generation, self._generation(old_names[-1]) + 1)
+            # The new generation replaces the old one for readers as soon as its
+            # part is renamed into place; the old parts are only removed after
+            self._write(user, store, generation)
+            directory = self._user_dir(user)
+            for name in old_names:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+
+    @traced("storage.append")
+    def append(self, user, store):
+        with self._lock:
+            names = self._all_parts(user)
+            self._write(user, store, self._generation(names[-1]) if names else time.time_ns())
+
+    def _table(self, user, lo, hi):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        conditions = []
+        if lo is not None:
+            conditions.append(ds.field("date") >= pa.scalar(lo, type=pa.date32()))
+        if hi is not None:
+            conditions.append(ds.field("date") < pa.scalar(hi, type=pa.date32()))
+        condition = None
+        for bound in conditions:
+            condition = bound if condition is None else condition & bound
+        # Each part has its own category dictionary; unify them once for grouping and loading
+        return self._read_current(
+            user, lambda parts: ds.dataset(parts, format="parquet").to_table(filter=condition).unify_dictionaries()
+        )
+
+    @traced("storage.load", rows=len)
+    def load(self, user, start=None, end=None):
+        with self._lock:
+            table = self._table(user, *_month_days(start, end))
+        return TransactionStore.empty() if table is None else store_from_table(table)
+
+    def info(self, user):
+        import pyarrow.parquet as pq
+
+        def read(parts):
+            return {
+                # Every write adds a newer part, so the newest part's name identifies the content
+                "revision": os.path.basename(parts[-1])[:-len(".parquet")],
+                "rows": sum(pq.ParquetFile(path).metadata.num_rows for path in parts),
+                "updated_at": os.path.getmtime(parts[-1]),
+            }
+
+        with self._lock:
+            return self._read_current(user, read)
+
+    def users(self):
+        from urllib.parse import unquote
+
+        return sorted(
+            unquote(name[len("user-"):]) for name in os.listdir(self.root)
+            if name.startswith("user-") and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def delete(self, user):
+        with self._lock:
+            directory = self._user_dir(user)
+            for name in self._all_parts(user):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+            try:
+                os.rmdir(self._user_dir(user))
+            except OSError:
+                pass
+
+    @traced("storage.aggregate")
+    def _aggregate(self, user, lo, hi):
+        import pyarrow.compute as pc
+
+        with self._lock:
+            table = self._table(user, lo, hi)
+        if table is None or not table.num_rows:
+            return [], [], [], None, None
+        grouped = table.group_by("category").aggregate([("amount", "sum"), ("amount", "count")])
+        days = pc.min_max(table.column("date").cast("int32"))
+        return (
+            [str(name) for name in grouped.column("category").to_pylist()],
+            grouped.column("amount_sum").to_pylist(),
+            grouped.column("amount_count").to_pylist(),
+            days["min"].as_py(),
+            days["max"].as_py()
+        )
+
+    def monthly_totals(self, user):
+        """[(YYYY-MM, category, spending, count)] for every month and category"""
+        import pyarrow.compute as pc
+
+        with self._lock:
+            table = self._table(user, None, None)
+        if table is None or not table.num_rows:
+            return []
+        table = table.append_column("month", pc.strftime(table.column("date").cast("timestamp[s]"), format="%Y-%m"))
+        grouped = table.group_by(["month", "category"]).aggregate([("amount", "sum"), ("amount", "count")])
+        rows = zip(
+            grouped.column("month").to_pylist(), [str(c) for c in grouped.column("category").to_pylist()],
+            grouped.column("amount_sum").to_pylist(), grouped.column("amount_count").to_pylist()
+        )
+        return sorted(rows)
+
+
+def get_storage():
+    """Process-wide storage backend chosen by FINANCE_BUDDY_STORAGE"""
+    global _default_storage
+    with _default_lock:
+        if _default_storage is None:
+            if STORAGE_BACKEND == "sqlite":
+                _default_storage = SQLiteStorage(STORAGE_PATH)
+            elif STORAGE_BACKEND == "parquet":
+                _default_storage = ParquetStorage(STORAGE_PATH)
+            else:
+                raise ValueError(f"unknown FINANCE_BUDDY_STORAGE backend {STORAGE_BACKEND!r} (use sqlite or parquet)")
+        return _default_storage
@@ -0,0 +1,582 @@
+"""Array-backed transaction storage for AI Finance Buddy.
+
+Transactions are held column-wise: a float64 amount column, dictionary-encoded
+categories (int32 codes into a list of distinct names) and datetime64 dates.
+Rows are kept in date order. Alongside the per-category totals each store
+keeps a month × category rollup, so a summary for any month or range of months
+is a slice of the rollup rather than a scan of the rows. Aggregates are
+computed once per data version and shared as a ``FinancialSummary`` by the
+dashboard, report, AI prompt and charts.
+
+Stores are never modified in place (cached stores are shared between
+sessions). ``append``, ``delete`` and ``update`` return a new store whose
+per-category totals and version are derived from the parent's by applying
+only the changed rows. Appends write into spare capacity shared with the
+parent, so adding a few rows to the end of a large history is amortized
+O(rows added).
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from .tracing import traced
+
+# Smallest capacity allocated when a store first grows by appending
+_MIN_CAPACITY = 1024
+
+# Category given to rows whose category is missing (a blank cell)
+UNKNOWN_CATEGORY = "Unknown"
+
+_grow_lock = threading.Lock()
+
+
+def _factorize_categories(column):
+    """(codes, category names) for a category column; missing values are UNKNOWN_CATEGORY, never code -1"""
+    codes, uniques = pd.factorize(column.fillna(UNKNOWN_CATEGORY).astype(str), sort=False)
+    return codes, [str(name) for name in uniques]
+
+
+@dataclass(frozen=True)
+class FinancialSummary:
+    """Totals for one data version and salary, shared by every consumer"""
+    salary: float
+    total_spending: float
+    savings: float
+    savings_rate: float
+    categories: dict
+    transaction_count: int
+    version: str
+    # Number of months covered; salary, spending and savings are totals over them
+    months: int = 1
+    period: str = ""
+    # (YYYY-MM, spending) for each month of the period, oldest first, when known
+    month_totals: tuple = ()
+
+    @property
+    def monthly_salary(self):
+        return self.salary / self.months
+
+    @property
+    def monthly_spending(self):
+        return self.total_spending / self.months
+
+    @property
+    def monthly_savings(self):
+        return self.savings / self.months
+
+    @property
+    def category_count(self):
+        return len(self.categories)
+
+    @property
+    def top_category(self):
+        """Category with the highest spending, or None when there is no data"""
+        if not self.categories:
+            return None
+        return max(self.categories, key=self.categories.get)
+
+    def sorted_categories(self):
+        """Categories as (name, amount) pairs, highest spending first"""
+        return sorted(self.categories.items(), key=lambda x: x[1], reverse=True)
+
+
+class _ColumnBuffers:
+    """Over-allocated columns shared by a chain of appended stores.
+
+    Each store views ``[:len(store)]``; only the store whose length equals
+    ``used`` (the newest in the chain) may append in place, anyone else copies.
+    """
+
+    def __init__(self, store, capacity):
+        self.amounts = np.empty(capacity, dtype=np.float64)
+        self.codes = np.empty(capacity, dtype=np.int32)
+        self.dates = np.empty(capacity, dtype='datetime64[D]')
+        used = len(store)
+        self.amounts[:used] = store.amounts
+        self.codes[:used] = store.category_codes
+        self.dates[:used] = store.dates
+        self.used = used
+
+    @property
+    def capacity(self):
+        return len(self.amounts)
+
+
+def _chained_version(parent, operation, *parts):
+    """Version of a derived store from its parent's version and the change applied"""
+    digest = hashlib.blake2b(parent.encode('ascii'), digest_size=16)
+    digest.update(operation.encode('ascii'))
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def _parse_dates(column):
+    """datetime64[D] array for a column of YYYY-MM-DD values; missing or invalid dates become today"""
+    dates = pd.to_datetime(column, errors='coerce', format='%Y-%m-%d').to_numpy(dtype='datetime64[D]')
+    missing = np.isnat(dates)
+    if missing.any():
+        dates[missing] = np.datetime64(date.today(), 'D')
+    return dates
+
+
+def _date_order(dates):
+    """Stable permutation putting rows in date order, or None when they already are"""
+    if len(dates) < 2 or not (dates[1:] < dates[:-1]).any():
+        return None
+    return np.argsort(dates, kind='stable')
+
+
+def _month_numbers(dates):
+    """Months since 1970-01 for each date"""
+    return dates.astype('datetime64[M]').astype(np.int64)
+
+
+def _to_month(value):
+    """Months since 1970-01 for a 'YYYY-MM' string, a date or a datetime64"""
+    return int(np.datetime64(value, 'M').astype(np.int64))
+
+
+def month_label(month):
+    """'YYYY-MM' for a month number"""
+    return str(np.int64(month).astype('datetime64[M]'))
+
+
+def _period_label(first, last):
+    names = [datetime.strptime(month_label(m), '%Y-%m').strftime('%b %Y') for m in (first, last)]
+    return names[0] if first == last else f"{names[0]} – {names[1]}"
+
+
+def build_summary(salary, first, last, categories, totals, counts, version, month_totals=()):
+    """FinancialSummary for months first..last (inclusive) from per-category totals and counts"""
+    months = last - first + 1
+    income = float(salary) * months
+    total_spending = float(np.sum(totals))
+    savings = income - total_spending
+    savings_rate = (savings / income * 100) if income > 0 else 0
+
+    return FinancialSummary(
+        salary=income,
+        total_spending=total_spending,
+        savings=savings,
+        savings_rate=savings_rate,
+        categories={
+            name: total
+            for name, total, count in zip(categories, np.asarray(totals).tolist(), np.asarray(counts).tolist())
+            if count  # categories emptied by deletes or edits, or absent from the period, drop out
+        },
+        transaction_count=int(np.sum(counts)),
+        version=version,
+        months=months,
+        period=_period_label(first, last),
+        month_totals=tuple(month_totals)
+    )
+
+
+class TransactionStore:
+    """Compact columnar container for normalized transactions"""
+
+    def __init__(self, amounts, category_codes, categories, dates, totals=None, counts=None):
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.categories = list(categories)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self._version = None
+        self._totals = totals
+        self._counts = counts
+        self._rollup = None
+        self._category_index = None
+        self._buffers = None
+        self._summaries = {}
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Build a store from a normalized category/amount/date DataFrame"""
+        if frame.empty:
+            return cls.empty()
+        codes, categories = _factorize_categories(frame['category'])
+        amounts = frame['amount'].to_numpy(dtype=np.float64)
+        dates = _parse_dates(frame['date'])
+        order = _date_order(dates)
+        if order is not None:
+            codes, amounts, dates = codes[order], amounts[order], dates[order]
+        return cls(amounts, codes, categories, dates)
+
+    @classmethod
+    def from_columns(cls, amounts, category_codes, categories, dates):
+        """Build a store from raw columns, putting the rows in date order if they are not already"""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        category_codes = np.asarray(category_codes, dtype=np.int32)
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        order = _date_order(dates)
+        if order is not None:
+            amounts, category_codes, dates = amounts[order], category_codes[order], dates[order]
+        return cls(amounts, category_codes, categories, dates)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a store from a list of {"category", "amount", "date"} dicts"""
+        return cls.from_frame(pd.DataFrame(records, columns=['category', 'amount', 'date']))
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0), np.empty(0), [], np.empty(0))
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the columns and category dictionary"""
+        names = sum(len(c) for c in self.categories)
+        return self.amounts.nbytes + self.category_codes.nbytes + self.dates.nbytes + names
+
+    @property
+    def version(self):
+        """Content fingerprint identifying this exact set of transactions"""
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(self.amounts.tobytes())
+            digest.update(self.category_codes.tobytes())
+            digest.update(self.dates.tobytes())
+            digest.update('\x1f'.join(self.categories).encode('utf-8'))
+            self._version = digest.hexdigest()
+        return self._version
+
+    def category_totals(self):
+        """Per-category spending as a float64 array aligned with self.categories"""
+        if self._totals is None:
+            self._totals = np.bincount(self.category_codes, weights=self.amounts, minlength=len(self.categories))
+        return self._totals
+
+    def category_counts(self):
+        """Transactions per category, aligned with self.categories"""
+        if self._counts is None:
+            self._counts = np.bincount(self.category_codes, minlength=len(self.categories))
+        return self._counts
+
+    def month_rollup(self):
+        """(first month number, month × category totals, month × category counts)"""
+        if self._rollup is None:
+            size = len(self.categories)
+            if not len(self):
+                self._rollup = (0, np.zeros((0, size)), np.zeros((0, size), dtype=np.int64))
+            else:
+                months = _month_numbers(self.dates)
+                first = int(months.min())
+                shape = (int(months.max()) - first + 1, size)
+                flat = (months - first) * size + self.category_codes
+                self._rollup = (
+                    first,
+                    np.bincount(flat, weights=self.amounts, minlength=shape[0] * size).reshape(shape),
+                    np.bincount(flat, minlength=shape[0] * size).reshape(shape)
+                )
+        return self._rollup
+
+    def months(self):
+        """'YYYY-MM' labels of the months that have transactions, oldest first"""
+        first, _, counts = self.month_rollup()
+        return [month_label(first + i) for i in np.flatnonzero(counts.sum(axis=1))]
+
+    def _month_span(self, start, end):
+        """Inclusive (first, last) month numbers for a range, defaulting to the data's own span"""
+        if start is None or end is None:
+            if len(self):
+                data_first, data_last = _month_numbers(self.dates[[0, -1]]).tolist()
+            else:
+                data_first = data_last = _to_month(date.today())
+        first = _to_month(start) if start is not None else data_first
+        last = _to_month(end) if end is not None else data_last
+        if first > last:
+            raise ValueError(f"period starts after it ends: {month_label(first)} > {month_label(last)}")
+        return first, last
+
+    def rows_between(self, start=None, end=None):
+        """(start, stop) row positions of the transactions in an inclusive month range"""
+        first, last = self._month_span(start, end)
+        bounds = np.array([first, last + 1]).astype('datetime64[M]').astype('datetime64[D]')
+        lo, hi = np.searchsorted(self.dates, bounds).tolist()
+        return lo, hi
+
+    @traced("summary")
+    def summary(self, salary, start=None, end=None):
+        """Totals, per-category sums and savings rate, computed once per version, salary and period.
+
+        ``salary`` is monthly and is multiplied by the number of months covered.
+        ``start``/``end`` ('YYYY-MM', inclusive) scope the summary to a range of
+        months by slicing the monthly rollup; by default it covers all the data.
+        """
+        salary = float(salary)
+        first, last = self._month_span(start, end)
+        whole = start is None and end is None
+        key = (salary, None, None) if whole else (salary, first, last)
+        cached = self._summaries.get(key)
+        if cached is not None:
+            return cached
+
+        rollup_first, month_totals, month_counts = self.month_rollup()
+        lo = min(max(first - rollup_first, 0), len(month_totals))
+        hi = min(max(last + 1 - rollup_first, 0), len(month_totals))
+        if whole:
+            totals, counts = self.category_totals(), self.category_counts()
+        else:
+            totals, counts = month_totals[lo:hi].sum(axis=0), month_counts[lo:hi].sum(axis=0)
+        spending = dict(zip(range(rollup_first + lo, rollup_first + hi), month_totals[lo:hi].sum(axis=1).tolist()))
+        trend = [(month_label(month), spending.get(month, 0.0)) for month in range(first, last + 1)]
+
+        summary = build_summary(salary, first, last, self.categories, totals, counts, self.version, trend)
+        self._summaries[key] = summary
+        return summary
+
+    def to_frame(self, start=None, stop=None):
+        """Expand rows [start:stop] back to a category/amount/date DataFrame for display and export"""
+        names = np.asarray(self.categories, dtype=object)
+        codes = self.category_codes[start:stop]
+        return pd.DataFrame({
+            "category": names[codes] if len(codes) else np.empty(0, dtype=object),
+            "amount": self.amounts[start:stop],
+            "date": np.datetime_as_string(self.dates[start:stop], unit='D')
+        })
+
+    def to_records(self):
+        """Expand back to the unified list-of-dicts format"""
+        return self.to_frame().to_dict('records')
+
+    def _codes_for(self, names):
+        """Codes for category names plus the category list extended with any new ones"""
+        if self._category_index is None:
+            self._category_index = {name: code for code, name in enumerate(self.categories)}
+        index = self._category_index
+        categories = self.categories
+        codes = []
+        for name in names:
+            code = index.get(name)
+            if code is None:
+                if categories is self.categories:
+                    categories = list(categories)
+                    index = dict(index)
+                code = index[name] = len(categories)
+                categories.append(name)
+            codes.append(code)
+        return np.asarray(codes, dtype=np.int32), categories
+
+    def _columns_from(self, frame):
+        """(codes, amounts, dates, categories) for a normalized category/amount/date frame"""
+        codes, uniques = _factorize_categories(frame['category'])
+        mapping, categories = self._codes_for(uniques)
+        return (
+            mapping[codes],
+            frame['amount'].to_numpy(dtype=np.float64),
+            _parse_dates(frame['date']),
+            categories
+        )
+
+    def _aggregates_with(self, categories, add=None, remove=None):
+        """Parent totals, counts and monthly rollup grown to `categories`, with
+        (codes, amounts, dates) rows added and removed"""
+        size = len(categories)
+        totals = np.zeros(size)
+        counts = np.zeros(size, dtype=np.int64)
+        totals[:len(self.categories)] = self.category_totals()
+        counts[:len(self.categories)] = self.category_counts()
+        for sign, rows in ((1, add), (-1, remove)):
+            if rows is not None:
+                totals += sign * np.bincount(rows[0], weights=rows[1], minlength=size)
+                counts += sign * np.bincount(rows[0], minlength=size)
+        totals[counts == 0] = 0.0  # no float residue on emptied categories
+        return totals, counts, self._rollup_with(size, add, remove)
+
+    def _rollup_with(self, size, add, remove):
+        """The parent's monthly rollup adjusted by the changed rows, if the parent has one"""
+        if self._rollup is None or not len(self._rollup[1]):
+            return None  # the child builds its own on first use
+        first, parent_totals, parent_counts = self._rollup
+        last = first + len(parent_totals) - 1
+        changes = [(sign, rows, _month_numbers(rows[2])) for sign, rows in ((1, add), (-1, remove))
+                   if rows is not None and len(rows[0])]
+        for _, _, months in changes:
+            first, last = min(first, int(months.min())), max(last, int(months.max()))
+
+        shape = (last - first + 1, size)
+        totals = np.zeros(shape)
+        counts = np.zeros(shape, dtype=np.int64)
+        offset = self._rollup[0] - first
+        totals[offset:offset + len(parent_totals), :parent_totals.shape[1]] = parent_totals
+        counts[offset:offset + len(parent_counts), :parent_counts.shape[1]] = parent_counts
+        for sign, rows, months in changes:
+            flat = (months - first) * size + rows[0]
+            totals += sign * np.bincount(flat, weights=rows[1], minlength=totals.size).reshape(shape)
+            counts += sign * np.bincount(flat, minlength=counts.size).reshape(shape)
+        totals[counts == 0] = 0.0
+        return first, totals, counts
+
+    def _positions(self, positions):
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1)
+        if len(positions) and (positions.min() < 0 or positions.max() >= len(self)):
+            raise IndexError(f"transaction positions out of range for {len(self)} rows")
+        return positions
+
+    def _derived(self, amounts, codes, categories, dates, aggregates, version):
+        totals, counts, rollup = aggregates
+        store = TransactionStore(amounts, codes, categories, dates, totals=totals, counts=counts)
+        store._rollup = rollup
+        store._version = version
+        return store
+
+    @traced("store.append")
+    def append(self, frame):
+        """New store with the rows of a normalized category/amount/date frame merged in by date.
+
+        Rows dated on or after the last existing row (the usual case) are written
+        into shared spare capacity; earlier ones are merged with one sort.
+        """
+        if frame.empty:
+            return self
+        codes, amounts, dates, categories = self._columns_from(frame)
+        order = _date_order(dates)
+        if order is not None:
+            codes, amounts, dates = codes[order], amounts[order], dates[order]
+        aggregates = self._aggregates_with(categories, add=(codes, amounts, dates))
+        version = _chained_version(
+            self.version, "append", amounts, codes, dates, '\x1f'.join(categories[len(self.categories):])
+        )
+
+        used, added = len(self), len(amounts)
+        if used and dates[0] < self.dates[-1]:
+            merged_dates = np.concatenate([self.dates, dates])
+            order = np.argsort(merged_dates, kind='stable')
+            return self._derived(
+                np.concatenate([self.amounts, amounts])[order], np.concatenate([self.category_codes, codes])[order],
+                categories, merged_dates[order], aggregates, version
+            )
+
+        with _grow_lock:
+            buffers = self._buffers
+            if buffers is None or buffers.used != used or buffers.capacity < used + added:
+                buffers = _ColumnBuffers(self, max(2 * (used + added), _MIN_CAPACITY))
+            buffers.amounts[used:used + added] = amounts
+            buffers.codes[used:used + added] = codes
+            buffers.dates[used:used + added] = dates
+            buffers.used = used + added
+
+        store = self._derived(
+            buffers.amounts[:used + added], buffers.codes[:used + added], categories,
+            buffers.dates[:used + added], aggregates, version
+        )
+        store._buffers = buffers
+        return store
+
+    def append_records(self, records):
+        """append() for a list of {"category", "amount", "date"} dicts"""
+        return self.append(pd.DataFrame(records, columns=['category', 'amount', 'date']))
+
+    @traced("store.delete")
+    def delete(self, positions):
+        """New store without the transactions at the given row positions"""
+        positions = np.unique(self._positions(positions))
+        if not len(positions):
+            return self
+        removed = (self.category_codes[positions], self.amounts[positions], self.dates[positions])
+        aggregates = self._aggregates_with(self.categories, remove=removed)
+        keep = np.ones(len(self), dtype=bool)
+        keep[positions] = False
+        return self._derived(
+            self.amounts[keep], self.category_codes[keep], self.categories, self.dates[keep],
+            aggregates, _chained_version(self.version, "delete", positions)
+        )
+
+    @traced("store.update")
+    def update(self, positions, category=None, amount=None, date=None):
+        """New store with the category, amount and/or date of the given rows replaced.
+
+        Each value may be a scalar applied to every position or a sequence with
+        one entry per position. Dates are ISO ``YYYY-MM-DD`` strings or dates;
+        rows whose date changes move to keep the store in date order.
+        """
+        positions = self._positions(positions)
+        if len(np.unique(positions)) != len(positions):
+            raise ValueError("each transaction position may only be updated once")
+        if not len(positions) or (category is None and amount is None and date is None):
+            return self
+
+        old_rows = (self.category_codes[positions], self.amounts[positions], self.dates[positions])
+        codes, amounts, dates = self.category_codes.copy(), self.amounts.copy(), self.dates
+        categories = self.categories
+        if category is not None:
+            names = np.broadcast_to(np.asarray(category, dtype=object), positions.shape)
+            new_codes, categories = self._codes_for([str(name) for name in names])
+            codes[positions] = new_codes
+        if amount is not None:
+            amounts[positions] = np.broadcast_to(np.asarray(amount, dtype=np.float64), positions.shape)
+        if date is not None:
+            dates = dates.copy()
+            dates[positions] = np.broadcast_to(np.asarray(date, dtype='datetime64[D]'), positions.shape)
+
+        aggregates = self._aggregates_with(
+            categories, add=(codes[positions], amounts[positions], dates[positions]), remove=old_rows
+        )
+        version = _chained_version(self.version, "update", positions, codes[positions], amounts[positions],
+                                   dates[positions], '\x1f'.join(categories[len(self.categories):]))
+        if date is not None:
+            order = _date_order(dates)
+            if order is not None:
+                amounts, codes, dates = amounts[order], codes[order], dates[order]
+        return self._derived(amounts, codes, categories, dates, aggregates, version)
+
+
+class TransactionStoreBuilder:
+    """Fold normalized chunks into a TransactionStore, keeping running aggregates"""
+
+    def __init__(self):
+        self._amounts = []
+        self._codes = []
+        self._dates = []
+        self._category_index = {}
+        self.categories = []
+        self.category_totals = np.zeros(0)
+        self.row_count = 0
+
+    def append_frame(self, frame):
+        """Add one normalized category/amount/date chunk"""
+        codes, uniques = _factorize_categories(frame['category'])
+        mapping = np.array([self._code_for(name) for name in uniques], dtype=np.int32)
+        codes = mapping[codes]
+        amounts = frame['amount'].to_numpy(dtype=np.float64)
+        dates = _parse_dates(frame['date'])
+
+        chunk_totals = np.bincount(codes, weights=amounts, minlength=len(self.categories))
+        chunk_totals[:len(self.category_totals)] += self.category_totals
+        self.category_totals = chunk_totals
+
+        self._amounts.append(amounts)
+        self._codes.append(codes)
+        self._dates.append(dates)
+        self.row_count += len(amounts)
+
+    def _code_for(self, name):
+        code = self._category_index.get(name)
+        if code is None:
+            code = len(self.categories)
+            self._category_index[name] = code
+            self.categories.append(name)
+        return code
+
+    def build(self):
+        """Concatenate the chunks in date order into a store primed with the running totals"""
+        if not self.row_count:
+            return TransactionStore.empty()
+        amounts = np.concatenate(self._amounts)
+        codes = np.concatenate(self._codes)
+        dates = np.concatenate(self._dates)
+        order = _date_order(dates)
+        if order is not None:
+            amounts, codes, dates = amounts[order], codes[order], dates[order]
+        return TransactionStore(amounts, codes, self.categories, dates, totals=self.category_totals)
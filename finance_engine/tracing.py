@@ -0,0 +1,200 @@
+"""Lightweight per-run stage tracing.
+
+A ``Trace`` made current with ``with trace:`` collects a ``Span`` for every
+``stage(...)`` block and ``@traced`` call on the same thread or task: wall
+time, rows produced and the change in process RSS. With no trace current (the
+default) ``stage`` returns a shared no-op span and ``@traced`` calls straight
+through, so instrumentation left in hot paths costs one ContextVar lookup.
+
+RSS is process-wide, so memory deltas are approximate when other sessions are
+working at the same time.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+
+# Trace every Streamlit rerun and always show the diagnostics panel
+TRACE_ENABLED = os.environ.get("FINANCE_BUDDY_TRACE", "").lower() not in ("", "0", "false", "no")
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("finance_buddy_trace", default=None)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def _rss_bytes():
+    """Current resident set size, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _NullSpan:
+    """Stand-in returned by stage() when tracing is off; ignores everything"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def rows(self):
+        return None
+
+    @rows.setter
+    def rows(self, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed stage; set ``rows`` inside the block once the count is known"""
+
+    def __init__(self, trace, name, rows=None):
+        self.trace = trace
+        self.name = name
+        self.rows = rows
+        self.depth = 0
+        self.offset = 0.0
+        self.seconds = None
+        self.rss_delta = None
+        self.error = None
+        self._start = 0.0
+        self._rss = None
+
+    def __enter__(self):
+        trace = self.trace
+        self.depth = trace._depth
+        trace._depth += 1
+        trace.spans.append(self)
+        self._rss = _rss_bytes()
+        self._start = time.perf_counter()
+        self.offset = self._start - trace._start
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        rss = _rss_bytes()
+        if rss is not None and self._rss is not None:
+            self.rss_delta = rss - self._rss
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.trace._depth -= 1
+        return False
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "offset_ms": round(self.offset * 1000, 3),
+            "ms": round(self.seconds * 1000, 3) if self.seconds is not None else None,
+            "rows": self.rows,
+            "rss_delta_bytes": self.rss_delta,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Spans recorded while this trace is current, in start order"""
+
+    def __init__(self, label="run"):
+        self.label = label
+        self.started_at = time.time()
+        self.seconds = None
+        self.spans = []
+        self._depth = 0
+        self._start = time.perf_counter()
+        self._token = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        _current.reset(self._token)
+        if logger.isEnabledFor(logging.DEBUG):
+            for line in self.log_lines():
+                logger.debug(line)
+        return False
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "started_at": self.started_at,
+            "ms": round(self.seconds * 1000, 3) if self.seconds is not None else None,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    def log_lines(self):
+        """Human-readable lines, one per span, indented by nesting depth"""
+        total = f"{self.seconds * 1000:.1f} ms" if self.seconds is not None else "running"
+        started = time.strftime("%H:%M:%S", time.localtime(self.started_at))
+        lines = [f"[{started}] {self.label}: {total}, {len(self.spans)} stages"]
+        for span in self.spans:
+            ms = f"{span.seconds * 1000:9.2f} ms" if span.seconds is not None else "  running"
+            line = f"  {'  ' * span.depth}{span.name:<{max(1, 36 - 2 * span.depth)}} {ms}"
+            if span.rows is not None:
+                line += f"  rows={span.rows:,}"
+            if span.rss_delta is not None:
+                line += f"  rss={span.rss_delta / 2**20:+.1f}MB"
+            if span.error:
+                line += f"  error={span.error}"
+            lines.append(line)
+        return lines
+
+
+def current_trace():
+    """The trace collecting spans in this context, or None when tracing is off"""
+    return _current.get()
+
+
+def stage(name, rows=None):
+    """Context manager timing one stage of the current trace (a no-op without one)"""
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return Span(trace, name, rows)
+
+
+def traced(name=None, rows=None):
+    """Decorator recording each call as a stage; ``rows(result)`` gives the row count"""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with Span(trace, label) as span:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    span.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def traces_to_json(traces):
+    """JSON export of several traces, oldest first"""
+    return json.dumps([trace.to_dict() for trace in traces], indent=2)
+
+
+def traces_to_log(traces):
+    """Plain-text log export of several traces, oldest first"""
+    return "\n".join(line for trace in traces for line in trace.log_lines()) + "\n"